@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: building and filtering the app list in a real window.
+Usage: python3 benchmarks/bench_gui.py [--size N] [--runs N]
+
+Run by run.py --gui with XDG_DATA_HOME pointing at a synthetic corpus
+(under xvfb-run when there is no display). Prints one JSON result per
+line: window construction, time until every app is listed, and the
+slowest search keystroke including the row rebinds it causes.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import gi  # noqa: E402
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Adw, GLib  # noqa: E402
+
+from desktop_linker import I18n  # noqa: E402
+from desktop_linker_gui import MainWindow  # noqa: E402
+from desktop_linker_service import LiveCatalog, LiveShortcuts  # noqa: E402
+
+QUERIES = ["firefox", "text editor", "termnl", "video play"]
+
+
+def drain(context):
+    while context.pending():
+        context.iteration(False)
+
+
+def run_once(size):
+    context = GLib.MainContext.default()
+    start = time.perf_counter()
+    catalog = LiveCatalog()
+    catalog.start()
+    shortcuts = LiveShortcuts()
+    shortcuts.start()
+    win = MainWindow(i18n=I18n("en"), catalog=catalog, shortcuts=shortcuts)
+    win.present()
+    built = time.perf_counter()
+
+    deadline = built + 120
+    while not catalog.loaded and time.perf_counter() < deadline:
+        context.iteration(True)
+    drain(context)
+    loaded = time.perf_counter()
+    if not catalog.loaded:
+        raise SystemExit("timed out waiting for the app list")
+
+    worst = 0.0
+    for query in QUERIES:
+        for n in range(1, len(query) + 1):
+            t = time.perf_counter()
+            win.app_search.set_text(query[:n])
+            win.on_app_search_changed(win.app_search)
+            drain(context)
+            worst = max(worst, time.perf_counter() - t)
+        win.app_search.set_text("")
+        win.on_app_search_changed(win.app_search)
+        drain(context)
+
+    win.close()
+    catalog.stop()
+    shortcuts.stop()
+    drain(context)
+    return built - start, loaded - start, worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    Adw.init()
+    runs = [run_once(args.size) for _ in range(args.runs)]
+    for i, name in enumerate(("gui/window_init", "gui/apps_listed", "gui/slowest_keystroke")):
+        timings = sorted(r[i] for r in runs)
+        print(json.dumps({
+            "name": name, "seconds": timings[0], "median": timings[len(timings) // 2],
+            "items": 1 if name == "gui/slowest_keystroke" else args.size,
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory retained per installed app by the catalog and search index.
+Usage: python3 benchmarks/bench_memory.py [--apps N]
+"""
+
+import os
+import gc
+import sys
+import argparse
+import tempfile
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+import desktop_linker as dl  # noqa: E402
+from corpus import write_corpus  # noqa: E402
+
+
+def retained(func):
+    """Run func and return (result, bytes still allocated afterwards)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apps", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "HOME": tmp,
+            "XDG_DATA_HOME": tmp,
+            "XDG_DATA_DIRS": os.path.join(tmp, "empty"),
+        })
+        write_corpus(os.path.join(tmp, "applications"), args.apps)
+        apps, catalog = retained(lambda: dl.find_installed_apps(use_cache=False))
+        _, index = retained(lambda: dl.AppSearchIndex(apps))
+
+    n = len(apps)
+    print(f"apps listed: {n}")
+    print(f"catalog      {catalog / 1024:9.0f} KiB  {catalog / n:7.0f} B/app")
+    print(f"search index {index / 1024:9.0f} KiB  {index / n:7.0f} B/app")
+    print(f"total        {(catalog + index) / 1024:9.0f} KiB  {(catalog + index) / n:7.0f} B/app")
+
+
+if __name__ == "__main__":
+    main()
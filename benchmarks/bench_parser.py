@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parse_desktop_file against the previous line-by-line parser.
+Usage: python3 benchmarks/bench_parser.py [--files N] [--runs N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+from desktop_linker import parse_desktop_file, APP_KEYS  # noqa: E402
+from corpus import write_corpus  # noqa: E402
+
+
+def legacy_parse_desktop_file(path):
+    """The parser before the streaming rewrite, kept for comparison."""
+    info = {}
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            in_section = False
+            for line in f:
+                line = line.strip()
+                if line == "[Desktop Entry]":
+                    in_section = True
+                    continue
+                if line.startswith("[") and line != "[Desktop Entry]":
+                    in_section = False
+                if in_section and "=" in line and not line.startswith("#"):
+                    key, _, val = line.partition("=")
+                    info[key.strip()] = val.strip()
+    except Exception:
+        pass
+    return info
+
+
+def measure(func, paths, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        for p in paths:
+            func(p)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_corpus(tmp, args.files)
+        size = sum(os.path.getsize(p) for p in paths)
+        print(f"corpus: {len(paths)} files, {size / 1024 / 1024:.1f} MiB")
+
+        cases = [
+            ("legacy (all keys)", legacy_parse_desktop_file),
+            ("streaming (all keys)", parse_desktop_file),
+            ("streaming (app keys, de_DE)",
+             lambda p: parse_desktop_file(p, APP_KEYS, "de_DE.UTF-8")),
+        ]
+        baseline = None
+        for label, func in cases:
+            seconds = measure(func, paths, args.runs)
+            baseline = baseline or seconds
+            print(f"{label:30} {seconds * 1000:8.1f} ms  "
+                  f"{len(paths) / seconds:9.0f} files/s  x{baseline / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-keystroke latency of AppSearchIndex on a synthetic catalog.
+Usage: python3 benchmarks/bench_search.py [--apps N] [--budget-ms MS]
+Exits non-zero if the slowest keystroke exceeds the budget (one 60 Hz frame).
+"""
+
+import os
+import sys
+import time
+import argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+from desktop_linker import AppSearchIndex  # noqa: E402
+from corpus import make_apps  # noqa: E402
+
+QUERIES = ["firefox", "text editor", "termnl", "zzzz", "video play"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apps", type=int, default=10000)
+    parser.add_argument("--budget-ms", type=float, default=1000 / 60)
+    args = parser.parse_args()
+
+    apps = make_apps(args.apps)
+    start = time.perf_counter()
+    index = AppSearchIndex(apps)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"index build: {args.apps} apps in {build_ms:.1f} ms")
+
+    worst = 0.0
+    for query in QUERIES:
+        timings = []
+        for n in range(1, len(query) + 1):
+            start = time.perf_counter()
+            results = index.search(query[:n])
+            timings.append((time.perf_counter() - start) * 1000)
+        worst = max(worst, max(timings))
+        print(f"{query!r:14} keystrokes={len(timings):2}  "
+              f"max={max(timings):6.2f} ms  mean={sum(timings) / len(timings):6.2f} ms  "
+              f"results={len(results)}")
+
+    ok = worst <= args.budget_ms
+    print(f"worst keystroke {worst:.2f} ms (budget {args.budget_ms:.2f} ms): "
+          f"{'OK' if ok else 'OVER BUDGET'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold-start time of the command-line path (no GTK import).
+Usage: python3 benchmarks/bench_startup.py [--runs N] [--budget-ms MS]
+Exits non-zero if the median run of any command exceeds the budget.
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+# The launcher the packages install, which reuses desktop_linker's .pyc
+SCRIPT = os.path.join(ROOT, "desktop-linker")
+COMMANDS = [["--help"], ["list-apps"], ["search", "term"]]
+
+
+def time_run(cmd):
+    start = time.perf_counter()
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    check = subprocess.run(
+        [sys.executable, "-c",
+         "import sys; sys.path.insert(0, sys.argv[1]); import desktop_linker; "
+         "sys.exit('gi' in sys.modules)", ROOT]
+    )
+    if check.returncode != 0:
+        print("FAIL: importing desktop_linker pulls in gi")
+        return 1
+
+    baseline = sorted(time_run([sys.executable, "-c", "pass"]) for _ in range(args.runs))
+    print(f"{'python -c pass':24} median={baseline[len(baseline) // 2]:6.1f} ms")
+
+    ok = True
+    for argv in COMMANDS:
+        # First run warms the app catalog cache
+        time_run([sys.executable, SCRIPT] + argv)
+        runs = sorted(time_run([sys.executable, SCRIPT] + argv) for _ in range(args.runs))
+        median = runs[len(runs) // 2]
+        ok = ok and median <= args.budget_ms
+        print(f"{' '.join(argv):24} median={median:6.1f} ms  min={runs[0]:6.1f} ms")
+
+    print(f"budget {args.budget_ms:.0f} ms: {'OK' if ok else 'OVER BUDGET'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
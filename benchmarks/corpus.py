@@ -0,0 +1,190 @@
+"""
+Synthetic .desktop corpora and app catalogs for the benchmarks.
+
+Entries look like real distribution files: dozens of translated Name,
+GenericName, Comment and Keywords keys, a long MimeType list and a few
+[Desktop Action ...] sections with their own translations. Everything is
+seeded, so a given size always produces the same corpus.
+"""
+
+import os
+import random
+
+LOCALES = [
+    "ar", "ast", "be", "bg", "bn", "ca", "cs", "da", "de", "de_AT", "el",
+    "en_GB", "eo", "es", "et", "eu", "fa", "fi", "fr", "ga", "gl", "he",
+    "hr", "hu", "id", "is", "it", "ja", "kk", "ko", "lt", "lv", "nb", "nl",
+    "pl", "pt", "pt_BR", "ro", "ru", "sk", "sl", "sr", "sr@latin", "sv",
+    "tr", "uk", "vi", "zh_CN", "zh_TW",
+]
+WORDS = [
+    "office", "writer", "image", "viewer", "terminal", "music", "player",
+    "video", "editor", "browser", "mail", "chat", "system", "monitor",
+    "settings", "files", "archive", "calendar", "notes", "photo", "code",
+    "studio", "game", "network", "backup", "disk", "font", "screen",
+]
+CATEGORIES = ["Office", "Graphics", "AudioVideo", "Development", "Network",
+              "System", "Utility", "Game", "Settings"]
+MIME_TYPES = ["text/plain", "text/html", "image/png", "image/jpeg",
+              "application/pdf", "audio/mpeg", "video/mp4", "application/zip",
+              "application/xml", "application/json", "inode/directory"]
+
+
+def make_entry(i, rnd, locales=len(LOCALES), actions=3):
+    words = rnd.sample(WORDS, 3)
+    name = " ".join(w.capitalize() for w in words[:2]) + f" {i}"
+    lines = [
+        "[Desktop Entry]",
+        "Version=1.0",
+        "Type=Application",
+        f"Name={name}",
+    ]
+    for loc in LOCALES[:locales]:
+        lines.append(f"Name[{loc}]={name} ({loc})")
+    lines.append(f"GenericName={words[1].capitalize()} {words[2].capitalize()}")
+    for loc in LOCALES[:locales]:
+        lines.append(f"GenericName[{loc}]={words[1]} {words[2]} {loc}")
+    lines.append(f"Comment={words[0].capitalize()} tool for {words[2]}")
+    for loc in LOCALES[:locales]:
+        lines.append(f"Comment[{loc}]={words[0]} tool for {words[2]} ({loc})")
+    lines.append("Keywords=" + ";".join(rnd.sample(WORDS, 4)) + ";")
+    for loc in LOCALES[:locales]:
+        lines.append(f"Keywords[{loc}]=" + ";".join(rnd.sample(WORDS, 4)) + ";")
+    lines += [
+        f"Exec=/usr/bin/{words[0]}-{words[1]}-{i} %U",
+        f"TryExec={words[0]}-{words[1]}-{i}",
+        f"Icon={words[0]}-{words[1]}",
+        "Terminal=false",
+        "Categories=" + ";".join(rnd.sample(CATEGORIES, 2)) + ";",
+        "MimeType=" + ";".join(rnd.sample(MIME_TYPES, 6)) + ";",
+        "StartupNotify=true",
+        "Actions=" + ";".join(f"action-{a}" for a in range(actions)) + ";",
+    ]
+    if i % 20 == 0:
+        lines.append("NoDisplay=true")
+    for a in range(actions):
+        lines += ["", f"[Desktop Action action-{a}]", f"Name=Action {a}"]
+        for loc in LOCALES[:locales]:
+            lines.append(f"Name[{loc}]=Action {a} ({loc})")
+        lines.append(f"Exec=/usr/bin/{words[0]}-{words[1]}-{i} --action-{a}")
+    return "\n".join(lines) + "\n"
+
+
+def write_corpus(directory, count, seed=42, locales=len(LOCALES), actions=3):
+    """Write count .desktop files into directory; return their paths."""
+    rnd = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"org.example.App{i}.desktop")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_entry(i, rnd, locales, actions))
+        paths.append(path)
+    return paths
+
+
+def link_corpus(paths, directory, count):
+    """Hard-link the first count files of a larger corpus into directory,
+    so several corpus sizes cost the disk space of the largest one."""
+    os.makedirs(directory, exist_ok=True)
+    linked = []
+    for src in paths[:count]:
+        dst = os.path.join(directory, os.path.basename(src))
+        try:
+            os.link(src, dst)
+        except OSError:
+            with open(src, "rb") as fin, open(dst, "wb") as fout:
+                fout.write(fin.read())
+        linked.append(dst)
+    return linked
+
+
+def make_apps(n, seed=42):
+    """In-memory apps shaped like find_installed_apps() results."""
+    from desktop_linker import AppRecord
+    rnd = random.Random(seed)
+    apps = []
+    for i in range(n):
+        words = rnd.sample(WORDS, 3)
+        name = " ".join(w.capitalize() for w in words[:2]) + f" {i}"
+        if i == n // 2:
+            name = "Firefox Web Browser"
+        apps.append(AppRecord(f"app{i}.desktop", f"/usr/share/applications/app{i}.desktop", {
+            "Name": name,
+            "GenericName": " ".join(words[1:]).title(),
+            "Comment": f"{words[0].capitalize()} tool for {words[2]} and {rnd.choice(WORDS)}",
+            "Keywords": ";".join(rnd.sample(WORDS, 4)) + ";",
+            "Categories": ";".join(rnd.sample(CATEGORIES, 2)) + ";",
+            "Exec": f"/usr/bin/{words[0]}-{words[1]}-{i} %U",
+        }))
+    return apps
+
+
+ICON_SIZES = [16, 22, 24, 32, 48, 64, 128, 256]
+
+
+def write_icon_theme(base, name, count, cache=True):
+    """Write a theme with count icons in every size under base/name, and
+    with cache=True an icon-theme.cache in GTK's format. Returns the
+    icon names."""
+    import struct
+    from desktop_linker import icon_name_hash
+
+    root = os.path.join(base, name)
+    dirs = [f"{s}x{s}/apps" for s in ICON_SIZES] + ["scalable/apps"]
+    with open(os.path.join(_makedirs(root), "index.theme"), "w") as f:
+        f.write(f"[Icon Theme]\nName={name}\nDirectories={','.join(dirs)}\n")
+        for s in ICON_SIZES:
+            f.write(f"\n[{s}x{s}/apps]\nSize={s}\nType=Fixed\n")
+        f.write("\n[scalable/apps]\nSize=128\nMinSize=8\nMaxSize=512\nType=Scalable\n")
+    names = [f"app-icon-{i}" for i in range(count)]
+    for d in dirs:
+        ext = ".svg" if d.startswith("scalable") else ".png"
+        path = _makedirs(os.path.join(root, d))
+        for icon in names:
+            open(os.path.join(path, icon + ext), "wb").close()
+    if not cache:
+        return names
+
+    # Header, hash table, icon records + names + image lists, directory list
+    n_buckets = max(1, count // 2)
+    buckets = [[] for _ in range(n_buckets)]
+    for icon in names:
+        buckets[icon_name_hash(icon.encode()) % n_buckets].append(icon)
+    out = bytearray(struct.pack(">HHII", 1, 0, 12, 0))
+    out += struct.pack(">I", n_buckets) + b"\0" * 4 * n_buckets
+    for b, chain in enumerate(buckets):
+        prev = None
+        for icon in chain:
+            record = len(out)
+            if prev is None:
+                struct.pack_into(">I", out, 16 + 4 * b, record)
+            else:
+                struct.pack_into(">I", out, prev, record)
+            out += b"\0" * 12
+            name_offset = len(out)
+            out += icon.encode() + b"\0"
+            out += b"\0" * (-len(out) % 4)
+            images = len(out)
+            out += struct.pack(">I", len(dirs))
+            for i, d in enumerate(dirs):
+                out += struct.pack(">HHI", i, 2 if d.startswith("scalable") else 4, 0)
+            struct.pack_into(">III", out, record, 0xFFFFFFFF, name_offset, images)
+            prev = record
+        if prev is None:
+            struct.pack_into(">I", out, 16 + 4 * b, 0xFFFFFFFF)
+    struct.pack_into(">I", out, 8, len(out))
+    out += struct.pack(">I", len(dirs))
+    offsets = len(out)
+    out += b"\0" * 4 * len(dirs)
+    for i, d in enumerate(dirs):
+        struct.pack_into(">I", out, offsets + 4 * i, len(out))
+        out += d.encode() + b"\0"
+    with open(os.path.join(root, "icon-theme.cache"), "wb") as f:
+        f.write(out)
+    return names
+
+
+def _makedirs(path):
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: discovery, parsing, search and shortcut creation on
+synthetic corpora of several sizes.
+Usage: python3 benchmarks/run.py [--sizes 100,1000,10000] [--runs N]
+                                 [--output FILE] [--baseline FILE] [--gui]
+
+Results are printed as a table and, with --output, written as JSON. With
+--baseline, every benchmark is compared against a previous --output file
+and the exit status is non-zero if one got slower than the tolerance.
+GUI-free benchmarks run headless; --gui also builds the app list in a
+window, under xvfb-run when no display is available.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+import desktop_linker as dl  # noqa: E402
+from corpus import LOCALES, write_corpus, link_corpus, make_apps, write_icon_theme  # noqa: E402
+
+# Replayed one keystroke at a time, like typing into the search entry
+QUERIES = ["firefox", "text editor", "termnl", "video play"]
+
+
+def measure(func, runs, setup=None):
+    """Return (best, median) wall time in seconds over runs calls."""
+    timings = []
+    for _ in range(runs):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg) if setup else func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[0], timings[len(timings) // 2]
+
+
+class Suite:
+    def __init__(self, runs, only=None):
+        self.runs = runs
+        self.only = only
+        self.results = []
+
+    def wanted(self, name):
+        return not self.only or any(name.startswith(o) for o in self.only)
+
+    def add(self, name, size, best, median, items=None):
+        items = items or size
+        self.results.append({
+            "name": name, "size": size, "seconds": best, "median": median,
+            "per_item_us": best / items * 1e6 if items else None,
+        })
+        print(f"{name:32}{size:>8}{best * 1000:>12.2f}{median * 1000:>12.2f}"
+              f"{best / items * 1e6 if items else 0:>12.2f}")
+
+    def run(self, name, size, func, items=None, setup=None):
+        if self.wanted(name):
+            self.add(name, size, *measure(func, self.runs, setup), items)
+
+
+def bench_discovery(suite, size, data_home):
+    os.environ["XDG_DATA_HOME"] = data_home
+    suite.run("find_installed_apps/cold", size,
+              lambda: dl.find_installed_apps(use_cache=False))
+    if suite.wanted("find_installed_apps/warm"):
+        dl.invalidate_app_cache()
+        dl.find_installed_apps()            # populate the catalog cache
+        suite.run("find_installed_apps/warm", size, dl.find_installed_apps)
+
+
+def bench_parser(suite, size, paths):
+    loc = dl.desktop_locale()
+    suite.run("parse_desktop_file/all", size,
+              lambda: [dl.parse_desktop_file(p) for p in paths])
+    suite.run("parse_desktop_file/app_keys", size,
+              lambda: [dl.parse_desktop_file(p, dl.APP_KEYS, loc) for p in paths])
+
+
+def bench_search(suite, size):
+    apps = make_apps(size)
+    suite.run("search/build_index", size, lambda: dl.AppSearchIndex(apps))
+    if not suite.wanted("search/slowest_keystroke"):
+        return
+    index = dl.AppSearchIndex(apps)
+    timings = []
+    for _ in range(suite.runs):
+        for query in QUERIES:
+            index.search("")
+            for n in range(1, len(query) + 1):
+                start = time.perf_counter()
+                index.search(query[:n])
+                timings.append(time.perf_counter() - start)
+    timings.sort()
+    # "seconds" is the slowest keystroke: that is what drops frames
+    suite.add("search/slowest_keystroke", size,
+              timings[-1], timings[len(timings) // 2], items=1)
+
+
+def bench_create(suite, size, tmp, app_path):
+    # Shortcut creation is measured in batches of at most 1000
+    n = min(size, 1000)
+    os.makedirs(tmp)
+    targets = [os.path.join(tmp, f"target {i}.txt") for i in range(n)]
+    for t in targets:
+        open(t, "w").close()
+    counter = [0]
+
+    def fresh_dir():
+        counter[0] += 1
+        path = os.path.join(tmp, f"desktop-{counter[0]}")
+        os.environ["XDG_CONFIG_HOME"] = os.path.join(tmp, f"config-{counter[0]}")
+        os.makedirs(os.environ["XDG_CONFIG_HOME"])
+        with open(os.path.join(os.environ["XDG_CONFIG_HOME"], "user-dirs.dirs"), "w") as f:
+            f.write(f'XDG_DESKTOP_DIR="{path}"\n')
+        os.makedirs(path)
+        return path
+
+    def single_files(desktop):
+        allocator = dl.NameAllocator(desktop)
+        for t in targets:
+            dl.create_file_shortcut(t, allocator=allocator)
+
+    def single_apps(desktop):
+        allocator = dl.NameAllocator(desktop)
+        for _ in range(n):
+            dl.create_app_shortcut(app_path, allocator=allocator)
+
+    suite.run("create_file_shortcut", n, single_files, setup=fresh_dir)
+    suite.run("create_file_shortcuts", n,
+              lambda _: dl.create_file_shortcuts(targets), setup=fresh_dir)
+    suite.run("create_app_shortcut", n, single_apps, setup=fresh_dir)
+
+    # Name allocation under collisions: the same name published n times in
+    # one batch, and once in a directory already holding n copies. The temp
+    # files are prepared untimed, so this is naming and link() alone.
+    def temp_files(desktop, count):
+        paths = [os.path.join(desktop, f".bench-{i}.tmp") for i in range(count)]
+        for p in paths:
+            open(p, "w").close()
+        return paths
+
+    def publishes(desktop, tmps):
+        allocator = dl.NameAllocator(desktop)
+        for tmp in tmps:
+            allocator.publish(tmp, "Same Name")
+
+    def batch_dir():
+        desktop = fresh_dir()
+        return desktop, temp_files(desktop, n)
+    suite.run("publish/same_name_batch", n, lambda arg: publishes(*arg), setup=batch_dir)
+
+    def crowded_dir():
+        desktop, tmps = batch_dir()
+        publishes(desktop, tmps)
+        return desktop, temp_files(desktop, 1)
+    suite.run("publish/crowded_dir", n, lambda arg: publishes(*arg),
+              items=1, setup=crowded_dir)
+
+
+def bench_icons(suite, size, tmp):
+    # Themes are written with at most 2000 icons in nine directories each
+    n = min(size, 2000)
+    if not (suite.wanted("icon_theme/cache_lookup") or suite.wanted("icon_theme/index_lookup")):
+        return
+    names = write_icon_theme(tmp, "Cached", n)
+    write_icon_theme(tmp, "Uncached", n, cache=False)
+
+    def lookups(theme):
+        icons = dl.IconTheme(theme, [tmp])
+        for name in names:
+            icons.lookup(name, 32)
+    # Includes opening the cache, or listing the directories once
+    suite.run("icon_theme/cache_lookup", n, lambda: lookups("Cached"))
+    suite.run("icon_theme/index_lookup", n, lambda: lookups("Uncached"))
+
+
+def bench_gui(suite, size, data_home):
+    cmd = [sys.executable, os.path.join(HERE, "bench_gui.py"),
+           "--size", str(size), "--runs", str(suite.runs)]
+    if not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+        if not shutil.which("xvfb-run"):
+            print(f"{'gui/*':32}{size:>8}  skipped: no display and no xvfb-run")
+            return
+        cmd = ["xvfb-run", "-a"] + cmd
+    env = dict(os.environ, XDG_DATA_HOME=data_home)
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f"{'gui/*':32}{size:>8}  failed: {proc.stderr.strip().splitlines()[-1:]}")
+        return
+    for line in proc.stdout.splitlines():
+        r = json.loads(line)
+        if suite.wanted(r["name"]):
+            suite.add(r["name"], size, r["seconds"], r["median"], r.get("items"))
+
+
+def compare(results, baseline_path, tolerance):
+    """Print the change against a baseline; return the regressions."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\n{'benchmark':32}{'size':>8}{'baseline ms':>12}{'now ms':>12}{'change':>9}")
+    for r in results:
+        base = baseline.get((r["name"], r["size"]))
+        if base is None or not base["seconds"]:
+            continue
+        ratio = r["seconds"] / base["seconds"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(r)
+        print(f"{r['name']:32}{r['size']:>8}{base['seconds'] * 1000:>12.2f}"
+              f"{r['seconds'] * 1000:>12.2f}{(ratio - 1) * 100:>+8.1f}%{flag}")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000",
+                        help="comma-separated corpus sizes (100 to 50000)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--locales", type=int, default=len(LOCALES),
+                        help="translations per key in the corpus")
+    parser.add_argument("--only", help="comma-separated benchmark name prefixes")
+    parser.add_argument("--gui", action="store_true", help="also run the GUI list benchmark")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown against the baseline (default: 0.15)")
+    args = parser.parse_args()
+
+    sizes = sorted({int(s) for s in args.sizes.split(",")})
+    if sizes[0] < 1 or sizes[-1] > 50000:
+        parser.error("sizes must be between 1 and 50000")
+    suite = Suite(args.runs, args.only.split(",") if args.only else None)
+
+    with tempfile.TemporaryDirectory(prefix="desktop-linker-bench-") as tmp:
+        # Keep the user's real caches, desktop and data dirs out of it
+        os.environ.update({
+            "HOME": tmp,
+            "XDG_CACHE_HOME": os.path.join(tmp, "cache"),
+            "XDG_DATA_DIRS": os.path.join(tmp, "empty"),
+        })
+        master = write_corpus(os.path.join(tmp, "master"), sizes[-1], locales=args.locales)
+
+        print(f"{'benchmark':32}{'size':>8}{'best ms':>12}{'median ms':>12}{'us/item':>12}")
+        for size in sizes:
+            data_home = os.path.join(tmp, f"data-{size}")
+            paths = link_corpus(master, os.path.join(data_home, "applications"), size)
+            bench_discovery(suite, size, data_home)
+            bench_parser(suite, size, paths)
+            bench_search(suite, size)
+            bench_create(suite, size, os.path.join(tmp, f"create-{size}"), paths[0])
+            bench_icons(suite, size, os.path.join(tmp, f"icons-{size}"))
+            if args.gui:
+                bench_gui(suite, size, data_home)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "runs": args.runs,
+            "locales": args.locales,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": suite.results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        regressions = compare(suite.results, args.baseline, args.tolerance)
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,19 +2,24 @@
 """
 Desktop Linker - Create desktop shortcuts on Linux
 Dependencies: python3-gi, gir1.2-gtk-4.0, gir1.2-adw-1
-"""
 
-import gi
-gi.require_version("Gtk", "4.0")
-gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw, Gio, GLib, Gdk
+This module holds the backend and the command-line interface and does not
+import gi, except GdkPixbuf when a custom icon image is imported; the GTK
+user interface lives in desktop_linker_gui and is only loaded when the
+window is requested.
+"""
 
+import io
 import os
+import re
+import sys
+import json
 import stat
-import glob
-import shutil
+import time
+import fnmatch
+import itertools
 import locale
-import subprocess
+import unicodedata
 from pathlib import Path
 
 
@@ -22,140 +27,283 @@ from pathlib import Path
 #  Translations
 # ─────────────────────────────────────────────
 
-TRANSLATIONS = {
-    "en": {
-        "app_title":            "Desktop Linker",
-        "tab_files":            "File / Folder",
-        "tab_apps":             "Applications",
-        "drop_hint":            "Drag a file or folder here\nor use the buttons below",
-        "no_path":              "No path selected",
-        "select_file_folder":   "Select a file or folder",
-        "btn_choose_file":      "Choose File",
-        "btn_choose_folder":    "Choose Folder",
-        "shortcut_name":        "Shortcut name",
-        "configure_shortcut":   "Configure shortcut",
-        "custom_icon":          "Custom icon (optional)",
-        "no_icon":              "No custom icon – default will be used",
-        "btn_choose_icon":      "Choose Icon",
-        "btn_clear_icon":       "Clear icon",
-        "btn_create_file":      "Create Shortcut",
-        "btn_create_app":       "Create App Shortcut",
-        "search_placeholder":   "Search apps…",
-        "unknown_app":          "Unknown",
-        "dialog_file_title":    "Select File",
-        "dialog_folder_title":  "Select Folder",
-        "dialog_icon_title":    "Select Icon",
-        "filter_images":        "Images (PNG, SVG, XPM)",
-        "toast_created":        "Shortcut created: {}",
-        "toast_error":          "Error: {}",
-        "toast_no_file":        "Please select a file or folder first!",
-        "toast_no_app":         "Please select an app from the list first!",
-        "lang_button_tooltip":  "Switch to German",
-        "about_app":            "Create desktop shortcuts for files, folders and applications.",
-        "about_version":        "Version",
-        "about_developer":      "Developer",
-    },
-    "de": {
-        "app_title":            "Desktop Linker",
-        "tab_files":            "Datei / Ordner",
-        "tab_apps":             "Anwendungen",
-        "drop_hint":            "Datei oder Ordner hierher ziehen\noder Button nutzen",
-        "no_path":              "Kein Pfad gewählt",
-        "select_file_folder":   "Datei oder Ordner auswählen",
-        "btn_choose_file":      "Datei wählen",
-        "btn_choose_folder":    "Ordner wählen",
-        "shortcut_name":        "Name der Verknüpfung",
-        "configure_shortcut":   "Verknüpfung konfigurieren",
-        "custom_icon":          "Eigenes Icon (optional)",
-        "no_icon":              "Kein eigenes Icon – Standard wird verwendet",
-        "btn_choose_icon":      "Icon wählen",
-        "btn_clear_icon":       "Icon zurücksetzen",
-        "btn_create_file":      "Verknüpfung erstellen",
-        "btn_create_app":       "App-Verknüpfung erstellen",
-        "search_placeholder":   "App suchen …",
-        "unknown_app":          "Unbekannt",
-        "dialog_file_title":    "Datei auswählen",
-        "dialog_folder_title":  "Ordner auswählen",
-        "dialog_icon_title":    "Icon auswählen",
-        "filter_images":        "Bilder (PNG, SVG, XPM)",
-        "toast_created":        "Verknüpfung erstellt: {}",
-        "toast_error":          "Fehler: {}",
-        "toast_no_file":        "Bitte erst eine Datei oder einen Ordner auswählen!",
-        "toast_no_app":         "Bitte erst eine App aus der Liste auswählen!",
-        "lang_button_tooltip":  "Auf Englisch wechseln",
-        "about_app":            "Erstellt Desktop-Verknüpfungen für Dateien, Ordner und Anwendungen.",
-        "about_version":        "Version",
-        "about_developer":      "Entwickler",
-    },
-    "ar": {
-        "app_title":            "Desktop Linker",
-        "tab_files":            "ملف / مجلد",
-        "tab_apps":             "التطبيقات",
-        "drop_hint":            "اسحب ملف او مجلد هنا\nاو استخدم اﻷزرار في اﻷسفل",
-        "no_path":              "لم يتم تحديد الموقع",
-        "select_file_folder":   "اختر ملفاً او مجلداً",
-        "btn_choose_file":      "اختر الملف",
-        "btn_choose_folder":    "اختر المجلد",
-        "shortcut_name":        "اسم اﻷختصار",
-        "configure_shortcut":   "التعديل على اﻷختصار",
-        "custom_icon":          "ايقونة مخصصة (اختياري)",
-        "no_icon":              "لم يتم اختيار ايقونة مخصصة - سوف تستخدم ايقونة افتراضية",
-        "btn_choose_icon":      "اختر ايقونة",
-        "btn_clear_icon":       "ازالة اﻷيقونة",
-        "btn_create_file":      "صنع الاختصار",
-        "btn_create_app":       "صنع اختصار لتطبيق",
-        "search_placeholder":   "ابحث التطبيقات...",
-        "unknown_app":          "غير معرف",
-        "dialog_file_title":    "اختر الملف",
-        "dialog_folder_title":  "اختر المجلد",
-        "dialog_icon_title":    "اختر اﻷيقونة",
-        "filter_images":        "(PNG, SVG, XPM) الصور",
-        "toast_created":        "تم صنع اﻷختصار: {}",
-        "toast_error":          "خطا: {}",
-        "toast_no_file":        "الرجاء اختر ملف او مجلد اولاً!",
-        "toast_no_app":         "الرجاء اختر تطبيقاً من القائمة املاً!",
-        "lang_button_tooltip":  "التحويل الى الانجليزية",
-        "about_app":            "صنع اختصارات للتطبيقات, والملفات, والمجلدات في سطح المكتب",
-        "about_version":        "اﻷصدار",
-        "about_developer":      "صانع البرنامج",
-    }
-}
+# Strings live in locales/<lang>.json; locales/index.json lists the
+# languages (in switching order) with their native name and flag.
+LOCALE_DIR_ENV = "DESKTOP_LINKER_LOCALE_DIR"
+FALLBACK_LANGUAGE = "en"
 
 APP_VERSION = "1.0.0"
 APP_DEVELOPER = "aumuck"
 
+_catalogs = {}
+_languages = None
+
+
+def get_locale_dir():
+    """Directory holding the translation catalogs."""
+    override = os.environ.get(LOCALE_DIR_ENV)
+    if override:
+        return Path(override)
+    return Path(os.path.realpath(__file__)).parent / "locales"
+
+
+def available_languages():
+    """{code: {"name": ..., "flag": ...}} for every shipped language."""
+    global _languages
+    if _languages is None:
+        try:
+            with open(get_locale_dir() / "index.json", "r", encoding="utf-8") as f:
+                _languages = json.load(f)
+        except (OSError, ValueError):
+            _languages = {}
+        if not isinstance(_languages, dict) or not _languages:
+            _languages = {FALLBACK_LANGUAGE: {"name": "English"}}
+    return _languages
+
+
+def load_catalog(lang):
+    """The strings of one language, read on first use ({} if unavailable)."""
+    catalog = _catalogs.get(lang)
+    if catalog is None:
+        try:
+            with open(get_locale_dir() / f"{lang}.json", "r", encoding="utf-8") as f:
+                catalog = json.load(f)
+        except (OSError, ValueError):
+            catalog = {}
+        if not isinstance(catalog, dict):
+            catalog = {}
+        _catalogs[lang] = catalog
+    return catalog
+
 
 def detect_language():
-    """Detect system language, fall back to English."""
+    """Pick the first available language from $LANGUAGE and the message
+    locale (lang_COUNTRY before lang), fall back to English."""
+    available = available_languages()
+    candidates = os.environ.get("LANGUAGE", "").split(":")
+    candidates.append(desktop_locale())
     try:
-        lang = locale.getlocale()[0] or ""
-        if lang.startswith("de"):
-            return "de"
-        elif lang.startswith("ar"):
-            return "ar"
+        candidates.append(locale.getlocale()[0] or "")
     except Exception:
         pass
-    return "en"
+    for loc in candidates:
+        for variant in locale_variants(loc):
+            lang = variant.decode("ascii")
+            if lang in available:
+                return lang
+    return FALLBACK_LANGUAGE
 
 
 class I18n:
-    """Simple translation helper."""
+    """Simple translation helper.
+
+    Only the active language and the English fallback are loaded; looked
+    up strings are memoized until the language changes.
+    """
     def __init__(self, lang=None):
         self.lang = lang or detect_language()
+        self._strings = {}
 
     def t(self, key):
-        return TRANSLATIONS.get(self.lang, TRANSLATIONS["en"]).get(key, key)
+        value = self._strings.get(key)
+        if value is None:
+            value = load_catalog(self.lang).get(key)
+            if value is None:
+                value = load_catalog(FALLBACK_LANGUAGE).get(key, key)
+            self._strings[key] = value
+        return value
+
+    def next_language(self):
+        langs = list(available_languages())
+        if self.lang not in langs:
+            return langs[0]
+        return langs[(langs.index(self.lang) + 1) % len(langs)]
+
+    def switch(self, lang=None):
+        """Switch to lang, or to the next available language."""
+        self.lang = lang or self.next_language()
+        self._strings = {}
+
+
+# ─────────────────────────────────────────────
+#  Profiling
+# ─────────────────────────────────────────────
+
+PROFILE_ENV = "DESKTOP_LINKER_PROFILE"
 
-    def switch(self):
-        self.lang = "de" if self.lang == "en" else "en"
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+class Profiler:
+    """Opt-in timing spans, counters and marks.
+
+    Enabled with --profile[=FILE] or DESKTOP_LINKER_PROFILE=1 (or =FILE).
+    While disabled, span() returns a shared no-op context manager and
+    count()/mark() return immediately, so instrumentation can stay in hot
+    paths. finish() prints a summary to stderr and, if a file was given,
+    writes a Chrome trace (chrome://tracing, Perfetto).
+    """
+    def __init__(self):
+        self.enabled = False
+        self.trace_path = None
+        self.counters = {}
+        self.spans = []         # (name, thread id, start ns, end ns)
+        self.marks = []         # (name, thread id, ns)
+        self._t0 = time.perf_counter_ns()
+
+    @classmethod
+    def from_env(cls):
+        profiler = cls()
+        value = os.environ.get(PROFILE_ENV, "")
+        if value and value != "0":
+            profiler.enable(None if value == "1" else value)
+        return profiler
+
+    def enable(self, trace_path=None):
+        import threading
+        self._lock = threading.Lock()
+        self._ident = threading.get_ident
+        self.enabled = True
+        self.trace_path = trace_path or self.trace_path
+
+    def span(self, name):
+        """Context manager timing a block of code."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def mark(self, name):
+        """Record a point in time, e.g. the first frame being shown."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.marks.append((name, self._ident(), time.perf_counter_ns()))
+
+    def _record(self, name, start, end):
+        with self._lock:
+            self.spans.append((name, self._ident(), start, end))
+
+    def summary(self):
+        totals = {}
+        for name, _, start, end in self.spans:
+            calls, total, longest = totals.get(name, (0, 0, 0))
+            totals[name] = (calls + 1, total + end - start, max(longest, end - start))
+        elapsed = (time.perf_counter_ns() - self._t0) / 1e6
+        lines = [f"desktop-linker profile ({elapsed:.1f} ms)"]
+        if totals:
+            lines.append(f"  {'span':<28}{'calls':>8}{'total ms':>12}{'max ms':>10}")
+            for name, (calls, total, longest) in sorted(
+                    totals.items(), key=lambda kv: -kv[1][1]):
+                lines.append(f"  {name:<28}{calls:>8}{total / 1e6:>12.2f}{longest / 1e6:>10.2f}")
+        if self.counters:
+            lines.append(f"  {'counter':<28}{'value':>8}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"  {name:<28}{value:>8}")
+        if self.marks:
+            lines.append(f"  {'mark':<28}{'at ms':>8}")
+            for name, _, at in self.marks:
+                lines.append(f"  {name:<28}{(at - self._t0) / 1e6:>8.1f}")
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        """Write all spans, marks and final counters as a Chrome trace."""
+        pid = os.getpid()
+        us = lambda ns: (ns - self._t0) / 1000
+        events = [
+            {"name": name, "ph": "X", "pid": pid, "tid": tid,
+             "ts": us(start), "dur": (end - start) / 1000}
+            for name, tid, start, end in self.spans
+        ]
+        events += [
+            {"name": name, "ph": "i", "s": "p", "pid": pid, "tid": tid, "ts": us(at)}
+            for name, tid, at in self.marks
+        ]
+        if self.counters:
+            events.append({"name": "counters", "ph": "C", "pid": pid, "tid": 0,
+                           "ts": us(time.perf_counter_ns()), "args": self.counters})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def finish(self):
+        """Print the summary and write the trace file, once."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        print(self.summary(), file=sys.stderr)
+        if self.trace_path:
+            try:
+                self.write_trace(self.trace_path)
+                print(f"  trace written to {self.trace_path}", file=sys.stderr)
+            except OSError as e:
+                print(f"desktop-linker: cannot write trace: {e}", file=sys.stderr)
+
+
+profiler = Profiler.from_env()
 
 
 # ─────────────────────────────────────────────
 #  Backend helpers
 # ─────────────────────────────────────────────
 
-def get_desktop_dir():
-    """Get desktop path via XDG or fallback."""
+_USER_DIR_RE = re.compile(r'^\s*XDG_DESKTOP_DIR\s*=\s*(?:"((?:[^"\\]|\\.)*)"|(\S+))\s*$')
+_desktop_dir_cache = {}
+
+
+def parse_user_dirs(path):
+    """Read XDG_DESKTOP_DIR from a user-dirs.dirs file; None if not set."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            m = _USER_DIR_RE.match(line)
+            if not m:
+                continue
+            value = m.group(1) if m.group(1) is not None else m.group(2)
+            value = re.sub(r"\\(.)", r"\1", value)
+            home = str(Path.home())
+            for var in ("${HOME}", "$HOME"):
+                if value.startswith(var):
+                    value = home + value[len(var):]
+                    break
+            if not value.startswith("/"):
+                return None
+            return Path(value.rstrip("/") or "/")
+    return None
+
+
+def _xdg_user_dir_desktop():
+    import subprocess
     try:
         result = subprocess.run(
             ["xdg-user-dir", "DESKTOP"],
@@ -169,596 +317,2357 @@ def get_desktop_dir():
     return Path.home() / "Desktop"
 
 
-def find_installed_apps():
-    """Find all installed .desktop files."""
-    search_dirs = [
-        "/usr/share/applications",
-        "/usr/local/share/applications",
-        str(Path.home() / ".local/share/applications"),
-        "/var/lib/snapd/desktop/applications",
-        "/var/lib/flatpak/exports/share/applications",
-        str(Path.home() / ".local/share/flatpak/exports/share/applications"),
+def get_desktop_dir():
+    """Get desktop path from user-dirs.dirs, with xdg-user-dir as fallback.
+
+    The result is cached until user-dirs.dirs changes (mtime/size/inode).
+    """
+    config = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    dirs_file = os.path.join(config, "user-dirs.dirs")
+    try:
+        st = os.stat(dirs_file)
+        key = (dirs_file, st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        key = (dirs_file, None)
+    if _desktop_dir_cache.get("key") == key:
+        return _desktop_dir_cache["path"]
+
+    path = None
+    if key[1] is not None:
+        try:
+            path = parse_user_dirs(dirs_file)
+        except OSError:
+            pass
+    if path is None:
+        path = _xdg_user_dir_desktop()
+
+    _desktop_dir_cache["key"] = key
+    _desktop_dir_cache["path"] = path
+    return path
+
+
+def get_cache_dir():
+    """Get the per-user cache directory ($XDG_CACHE_HOME/desktop-linker)."""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "desktop-linker"
+
+
+def get_data_dirs():
+    """$XDG_DATA_HOME followed by $XDG_DATA_DIRS, highest precedence first."""
+    home = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local/share")
+    system = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    return [home] + [d for d in system.split(":") if d]
+
+
+def _data_subdirs(name):
+    """name/ below every data dir, highest precedence first.
+
+    Flatpak and snap export directories are appended when the session's
+    $XDG_DATA_DIRS does not already list them.
+    """
+    extra = [
+        str(Path.home() / ".local/share/flatpak/exports/share"),
+        "/var/lib/flatpak/exports/share",
+        "/var/lib/snapd/desktop",
     ]
-    apps = []
-    seen = set()
-    for d in search_dirs:
-        for f in glob.glob(os.path.join(d, "*.desktop")):
-            info = parse_desktop_file(f)
-            if info and info.get("Name") and info.get("Name") not in seen:
-                if info.get("NoDisplay", "false").lower() != "true":
-                    seen.add(info["Name"])
-                    info["_path"] = f
-                    apps.append(info)
-    apps.sort(key=lambda x: x["Name"].lower())
-    return apps
+    dirs = []
+    for d in get_data_dirs() + extra:
+        sub = os.path.normpath(os.path.join(d, name))
+        if os.path.isabs(sub) and sub not in dirs:
+            dirs.append(sub)
+    return dirs
 
 
-def parse_desktop_file(path):
-    """Parse a .desktop file into a dict."""
-    info = {}
+def get_app_search_dirs():
+    """applications/ directories to scan, highest precedence first."""
+    return _data_subdirs("applications")
+
+
+def get_icon_base_dirs():
+    """Icon theme base directories, highest precedence first."""
+    return [str(Path.home() / ".icons")] + _data_subdirs("icons")
+
+
+def desktop_file_id(path, dirs=None):
+    """Return (desktop_id, relative_path) for a file below one of the
+    search dirs, e.g. ("kde4-foo.desktop", "kde4/foo.desktop")."""
+    for root in dirs or get_app_search_dirs():
+        rel = os.path.relpath(path, root)
+        if not rel.startswith(".." + os.sep) and rel != "..":
+            return rel.replace(os.sep, "-"), rel
+    return os.path.basename(path), os.path.basename(path)
+
+
+def app_source_ref(path, dirs=None):
+    """What an app shortcut records as its source: the desktop-file ID of
+    an entry below a search dir, otherwise the entry's absolute path."""
+    path = os.path.abspath(path)
+    for root in dirs or get_app_search_dirs():
+        rel = os.path.relpath(path, root)
+        if not rel.startswith(".." + os.sep) and rel != "..":
+            return rel.replace(os.sep, "-")
+    return path
+
+
+def _find_app_file(desktop_id, dirs=None):
+    """Path of the file that wins for a desktop-file ID, or None.
+
+    Only stats files, so hidden and NoDisplay entries are found too; an ID
+    may also name a file in a subdirectory (kde4-foo.desktop).
+    """
+    for root in dirs or get_app_search_dirs():
+        path = _find_id_below(root, desktop_id)
+        if path:
+            return path
+    return None
+
+
+def _find_id_below(directory, rest):
+    path = os.path.join(directory, rest)
+    if os.path.isfile(path):
+        return path
+    start = 0
+    while True:
+        i = rest.find("-", start)
+        if i <= 0:
+            return None
+        sub = os.path.join(directory, rest[:i])
+        if os.path.isdir(sub):
+            found = _find_id_below(sub, rest[i + 1:])
+            if found:
+                return found
+        start = i + 1
+
+
+def _save_json(path, data):
+    """Write data as compact JSON to a temp file renamed over path; returns
+    False, leaving any previous file, if it cannot be written."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
     try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            in_section = False
-            for line in f:
-                line = line.strip()
-                if line == "[Desktop Entry]":
-                    in_section = True
-                    continue
-                if line.startswith("[") and line != "[Desktop Entry]":
-                    in_section = False
-                if in_section and "=" in line and not line.startswith("#"):
-                    key, _, val = line.partition("=")
-                    info[key.strip()] = val.strip()
-    except Exception:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        _unlink_quietly(tmp)
+        return False
+    return True
+
+
+class AppCatalogCache:
+    """Persistent cache of parsed .desktop files.
+
+    Entries are keyed by directory (mtime/inode) and by file
+    (mtime/inode/size), so a warm start only stats directories and files
+    and re-parses the files that changed. A missing, corrupt or outdated
+    cache file (or one written for another locale) is silently rebuilt.
+    scan_dir() may be called for several directories in parallel.
+    """
+    VERSION = 3
+    FILENAME = "apps.json"
+
+    def __init__(self, path=None, load=True):
+        self.path = Path(path) if path else get_cache_dir() / self.FILENAME
+        self.dirs = {}
+        self.dirty = False
+        self.locale = desktop_locale()
+        self._seen = set()
+        if load:
+            self._load()
+
+    def _load(self):
+        try:
+            with profiler.span("cache_load"), open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            self.dirty = True
+            return
+        if (not isinstance(data, dict)
+                or data.get("version") != self.VERSION
+                or data.get("locale") != self.locale
+                or not isinstance(data.get("dirs"), dict)):
+            self.dirty = True
+            return
+        self.dirs = data["dirs"]
+
+    def scan_dir(self, directory, prefix="", _visited=None):
+        """Return (desktop_id, path, info) for every .desktop file below a
+        directory; subdirectories contribute "subdir-" ID prefixes."""
+        self._seen.add(directory)
+        try:
+            st = os.stat(directory)
+        except OSError:
+            if self.dirs.pop(directory, None) is not None:
+                self.dirty = True
+            return []
+        visited = set() if _visited is None else _visited
+        if (st.st_dev, st.st_ino) in visited:
+            return []
+        visited.add((st.st_dev, st.st_ino))
+
+        dir_key = [st.st_mtime_ns, st.st_ino]
+        entry = self.dirs.get(directory)
+        try:
+            cached_files = entry["files"] if entry else {}
+            if entry and entry["stat"] == dir_key:
+                names, subdirs = list(cached_files), list(entry["subdirs"])
+            else:
+                names, subdirs = self._list_dir(directory)
+                profiler.count("dirs_listed")
+                self.dirty = True
+        except (TypeError, KeyError):
+            cached_files = {}
+            names, subdirs = self._list_dir(directory)
+            self.dirty = True
+
+        files = {}
+        results = []
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                fst = os.stat(path)
+            except OSError:
+                self.dirty = True
+                continue
+            file_key = [fst.st_mtime_ns, fst.st_ino, fst.st_size]
+            cached = cached_files.get(name)
+            if (isinstance(cached, list) and len(cached) == 2
+                    and cached[0] == file_key and isinstance(cached[1], dict)):
+                info = cached[1]
+                profiler.count("cache_hits")
+            else:
+                info = parse_app_entry(path)
+                profiler.count("cache_misses")
+                self.dirty = True
+            files[name] = [file_key, info]
+            results.append((prefix + name, path, info))
+
+        self.dirs[directory] = {"stat": dir_key, "files": files, "subdirs": subdirs}
+        for sub in subdirs:
+            results.extend(self.scan_dir(
+                os.path.join(directory, sub), f"{prefix}{sub}-", visited
+            ))
+        return results
+
+    @staticmethod
+    def _list_dir(directory):
+        names, subdirs = [], []
+        try:
+            with os.scandir(directory) as it:
+                for e in it:
+                    if e.name.startswith("."):
+                        continue
+                    try:
+                        if e.name.endswith(".desktop") and e.is_file():
+                            names.append(e.name)
+                        elif e.is_dir():
+                            subdirs.append(e.name)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        return names, subdirs
+
+    def save(self):
+        """Write the cache atomically; directories not scanned are dropped."""
+        stale = set(self.dirs) - self._seen
+        for d in stale:
+            del self.dirs[d]
+        if not self.dirty and not stale:
+            return
+        with profiler.span("cache_save"):
+            data = {"version": self.VERSION, "locale": self.locale, "dirs": self.dirs}
+            if _save_json(self.path, data):
+                self.dirty = False
+
+
+def invalidate_app_cache():
+    """Delete the persistent app catalog so the next scan starts fresh."""
+    try:
+        (get_cache_dir() / AppCatalogCache.FILENAME).unlink()
+    except FileNotFoundError:
         pass
-    return info
 
 
-def unique_path(base_path):
-    """Return a path that doesn't exist yet by appending a counter."""
-    p = base_path
-    counter = 1
-    while p.exists():
-        p = base_path.parent / f"{base_path.stem}_{counter}{base_path.suffix}"
-        counter += 1
-    return p
+def is_listed_app(info):
+    """Whether a parsed .desktop entry belongs in the app list."""
+    return (
+        bool(info.get("Name"))
+        and info.get("NoDisplay", "false").lower() != "true"
+        and info.get("Hidden", "false").lower() != "true"
+    )
 
 
-def create_file_shortcut(target_path, icon_path=None, custom_name=None):
-    """Create a .desktop shortcut for a file or folder."""
-    desktop_dir = get_desktop_dir()
-    desktop_dir.mkdir(parents=True, exist_ok=True)
+class AppRecord:
+    """An installed application, as listed and searched.
 
-    target = Path(target_path)
-    name = custom_name or target.name
+    Only the fields the window and the search index use are kept, in
+    slots; strings that repeat across apps (icons, categories, keywords)
+    are interned. Other keys are parsed from the file on first get().
+    """
+    __slots__ = ("id", "path", "name", "generic_name", "comment", "icon",
+                 "exec", "keywords", "categories", "_extra")
 
-    shortcut_path = unique_path(desktop_dir / f"{name}.desktop")
+    FIELDS = {
+        "Name": "name", "GenericName": "generic_name", "Comment": "comment",
+        "Icon": "icon", "Exec": "exec", "Keywords": "keywords",
+        "Categories": "categories",
+    }
 
-    if icon_path:
-        icon_line = f"Icon={icon_path}"
-    elif target.is_dir():
-        icon_line = "Icon=folder"
-    else:
-        suffix = target.suffix.lower()
-        mime_icons = {
-            ".pdf":  "application-pdf",
-            ".png":  "image-x-generic",
-            ".jpg":  "image-x-generic",
-            ".jpeg": "image-x-generic",
-            ".mp3":  "audio-x-generic",
-            ".ogg":  "audio-x-generic",
-            ".flac": "audio-x-generic",
-            ".mp4":  "video-x-generic",
-            ".mkv":  "video-x-generic",
-            ".sh":   "text-x-script",
-        }
-        icon_line = f"Icon={mime_icons.get(suffix, 'text-x-generic')}"
-
-    content = (
-        "[Desktop Entry]\n"
-        "Version=1.0\n"
-        "Type=Application\n"
-        f"Name={name}\n"
-        f"Exec=xdg-open \"{target}\"\n"
-        f"{icon_line}\n"
-        "Terminal=false\n"
-    )
-    shortcut_path.write_text(content, encoding="utf-8")
-    os.chmod(shortcut_path, os.stat(shortcut_path).st_mode | stat.S_IEXEC)
-    return str(shortcut_path)
+    def __init__(self, desktop_id, path, info):
+        intern = sys.intern
+        self.id = desktop_id
+        self.path = path
+        self.name = info.get("Name", "")
+        self.generic_name = intern(info.get("GenericName", ""))
+        self.comment = info.get("Comment", "")
+        self.icon = intern(info.get("Icon", ""))
+        self.exec = info.get("Exec", "")
+        self.keywords = intern(info.get("Keywords", ""))
+        self.categories = intern(info.get("Categories", ""))
+        self._extra = None
+
+    def get(self, key, default=None):
+        """Value of a [Desktop Entry] key, localized for the session."""
+        attr = self.FIELDS.get(key)
+        if attr is not None:
+            return getattr(self, attr) or default
+        if self._extra is None:
+            self._extra = parse_desktop_file(self.path, locale=desktop_locale())
+        return self._extra.get(key, default)
+
+    def __repr__(self):
+        return f"AppRecord({self.id!r}, {self.name!r})"
+
+
+def resolve_app(rel_path, dirs=None):
+    """Load the entry that wins for a relative path such as "firefox.desktop"
+    (the first search dir that has it); None if it is hidden or missing."""
+    dirs = dirs or get_app_search_dirs()
+    for root in dirs:
+        path = os.path.join(root, rel_path)
+        if os.path.isfile(path):
+            info = parse_app_entry(path)
+            if not is_listed_app(info):
+                return None
+            return AppRecord(rel_path.replace(os.sep, "-"), path, info)
+    return None
+
+
+def iter_installed_apps(use_cache=True, cache=None, max_workers=4):
+    """Yield lists of newly found apps, one list per search directory.
+
+    Directories are scanned recursively and concurrently, but results are
+    merged in precedence order: the first directory that provides a
+    desktop-file ID wins, and a hidden or NoDisplay entry there masks the
+    ones below it. Apps are AppRecord instances.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    cache = cache or AppCatalogCache(load=use_cache)
+    dirs = get_app_search_dirs()
+    seen = set()
 
+    def scan(directory):
+        with profiler.span("scan_dir"):
+            return cache.scan_dir(directory)
 
-def create_app_shortcut(desktop_file_path, icon_path=None, custom_name=None):
-    """Copy an app .desktop file to the desktop."""
-    desktop_dir = get_desktop_dir()
-    desktop_dir.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for entries in pool.map(scan, dirs):
+            batch = []
+            for desktop_id, path, info in entries:
+                if desktop_id in seen:
+                    continue
+                seen.add(desktop_id)
+                if is_listed_app(info):
+                    batch.append(AppRecord(desktop_id, path, info))
+            if batch:
+                yield batch
+    if use_cache:
+        cache.save()
 
-    info = parse_desktop_file(desktop_file_path)
-    name = custom_name or info.get("Name", Path(desktop_file_path).stem)
 
-    shortcut_path = unique_path(desktop_dir / f"{name}.desktop")
-    shutil.copy2(desktop_file_path, shortcut_path)
+def app_sort_key(app):
+    return app.name.lower()
 
-    if icon_path:
-        lines = shortcut_path.read_text(encoding="utf-8").splitlines()
-        new_lines = []
-        replaced = False
-        for line in lines:
-            if line.startswith("Icon="):
-                new_lines.append(f"Icon={icon_path}")
-                replaced = True
-            else:
-                new_lines.append(line)
-        if not replaced:
-            new_lines.append(f"Icon={icon_path}")
-        shortcut_path.write_text("\n".join(new_lines), encoding="utf-8")
 
-    os.chmod(shortcut_path, os.stat(shortcut_path).st_mode | stat.S_IEXEC)
-    return str(shortcut_path)
+def find_installed_apps(use_cache=True):
+    """Find all installed .desktop files."""
+    apps = [app for batch in iter_installed_apps(use_cache) for app in batch]
+    apps.sort(key=app_sort_key)
+    return apps
+
+
+# Keys the app list and search need from installed .desktop files
+APP_KEYS = frozenset((
+    "Type", "Name", "GenericName", "Comment", "Icon", "Exec",
+    "Keywords", "Categories", "NoDisplay", "Hidden",
+))
+
+_ESCAPES = {"s": " ", "n": "\n", "t": "\t", "r": "\r", "\\": "\\"}
+_ESCAPE_RE = re.compile(r"\\(.)")
+
+
+def unescape_value(value):
+    r"""Resolve the \s, \n, \t, \r and \\ escapes of the desktop entry spec."""
+    if "\\" not in value:
+        return value
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(0)), value)
+
+
+def escape_value(value):
+    """Inverse of unescape_value() for writing a string value."""
+    return (value.replace("\\", "\\\\").replace("\n", "\\n")
+            .replace("\t", "\\t").replace("\r", "\\r"))
+
+
+_EXEC_QUOTE_RE = re.compile(r'([`"$\\])')
+_EXEC_UNQUOTE_RE = re.compile(r'\\([`"$\\])')
+
+
+def quote_exec_arg(arg):
+    """Quote one argument for an Exec line: inside double quotes, with
+    `"$\\ backslash-escaped and % doubled. escape_value() still applies."""
+    return '"' + _EXEC_QUOTE_RE.sub(r"\\\1", arg).replace("%", "%%") + '"'
+
+
+def unquote_exec_arg(quoted):
+    """Inverse of quote_exec_arg() for the text between the quotes."""
+    return _EXEC_UNQUOTE_RE.sub(r"\1", quoted).replace("%%", "%")
+
+
+def desktop_locale():
+    """The message locale (LC_ALL > LC_MESSAGES > LANG), '' for C/POSIX."""
+    for var in ("LC_ALL", "LC_MESSAGES", "LANG"):
+        value = os.environ.get(var)
+        if value:
+            return "" if value in ("C", "POSIX") or value.startswith("C.") else value
+    return ""
+
+
+def locale_variants(loc):
+    """Matching [locale] suffixes for loc, best first (lang_COUNTRY@MODIFIER,
+    lang_COUNTRY, lang@MODIFIER, lang), as bytes."""
+    if not loc:
+        return ()
+    loc, _, modifier = loc.partition("@")
+    lang, _, country = loc.split(".")[0].partition("_")
+    variants = []
+    if country and modifier:
+        variants.append(f"{lang}_{country}@{modifier}")
+    if country:
+        variants.append(f"{lang}_{country}")
+    if modifier:
+        variants.append(f"{lang}@{modifier}")
+    variants.append(lang)
+    return tuple(v.encode("ascii", "ignore") for v in variants)
+
+
+_READ_CHUNK = 16384
+_entry_res = {}
+
+
+def _entry_re(keys, variants):
+    """Regex matching Key=value and Key[variant]=value lines for the wanted
+    keys; lines with other keys or locales never match. Every line is
+    anchored on the preceding newline, which lets re skip ahead quickly."""
+    cache_key = (keys, variants)
+    regex = _entry_res.get(cache_key)
+    if regex is None:
+        if keys is None:
+            key_pat = rb"[A-Za-z0-9-]+"
+        else:
+            key_pat = b"|".join(re.escape(k.encode("ascii")) for k in sorted(keys))
+        if variants:
+            loc_pat = rb"(?:\[(" + b"|".join(re.escape(v) for v in variants) + rb")\])?"
+        else:
+            loc_pat = rb"()"
+        regex = _entry_res[cache_key] = re.compile(
+            rb"\n[ \t]*(" + key_pat + rb")" + loc_pat + rb"[ \t]*=([^\r\n]*)"
+        )
+    return regex
+
+
+def _read_desktop_entry_group(f):
+    """Return the raw bytes of the [Desktop Entry] group (starting with a
+    newline), reading the file only up to the next group header."""
+    data = f.read(_READ_CHUNK)
+    if data.startswith(b"\xef\xbb\xbf"):
+        data = data[3:]
+    data = b"\n" + data
+    start = -1
+    while True:
+        if start < 0:
+            start = data.find(b"\n[Desktop Entry]")
+            if start >= 0:
+                start = data.find(b"\n", start + 1)
+        if start >= 0:
+            end = data.find(b"\n[", start)
+            if end >= 0:
+                return data[start:end]
+        chunk = f.read(_READ_CHUNK)
+        if not chunk:
+            return data[start:] if start >= 0 else b""
+        data += chunk
+
+
+def parse_desktop_file(path, keys=None, locale=None):
+    """Parse the [Desktop Entry] group of a .desktop file into a dict.
+
+    Reading stops at the end of the group, so [Desktop Action ...] sections
+    are never read. With keys, only those keys are kept. With a locale, the
+    best matching Key[xx] value replaces the plain value. Only kept values
+    are decoded; other keys and translations are skipped by the regex.
+    """
+    try:
+        with open(path, "rb") as f:
+            group = _read_desktop_entry_group(f)
+            if profiler.enabled:
+                profiler.count("files_parsed")
+                profiler.count("bytes_read", f.tell())
+        return _parse_entry_group(group, keys, locale)
+    except Exception:
+        return {}
+
+
+def _parse_entry_group(group, keys=None, locale=None):
+    keys = frozenset(keys) if keys is not None else None
+    variants = locale_variants(locale)
+    info = {}
+    rank = {}           # key -> rank of the locale variant currently stored
+    fallback = len(variants)
+    for key, loc, val in _entry_re(keys, variants).findall(group):
+        r = variants.index(loc) if loc else fallback
+        if r <= rank.get(key, r):
+            rank[key] = r
+            info[key.decode("ascii")] = unescape_value(val.strip().decode("utf-8", "ignore"))
+    return info
+
+
+def parse_app_entry(path):
+    """Parse only what the app list needs, localized for the session."""
+    return parse_desktop_file(path, APP_KEYS, desktop_locale())
 
 
 # ─────────────────────────────────────────────
-#  GUI
+#  Icon themes
 # ─────────────────────────────────────────────
 
-class DesktopLinkerApp(Adw.Application):
-    def __init__(self):
-        super().__init__(application_id="io.github.desktoplinker")
-        self.i18n = I18n()
-        self.connect("activate", self.on_activate)
+DEFAULT_ICON_THEME = "Adwaita"
+ICON_EXTENSIONS = (".png", ".svg", ".xpm")
+# icon-theme.cache image flags, in order of preference
+_CACHE_FLAGS = ((4, ".png"), (2, ".svg"), (1, ".xpm"))
 
-    def on_activate(self, app):
-        self.win = MainWindow(application=app, i18n=self.i18n)
-        self.win.present()
 
+def detect_icon_theme():
+    """Icon theme named in GTK's or KDE's settings files, else GTK's
+    default. GNOME keeps it in dconf; the window asks GTK instead."""
+    config = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    probes = [
+        ("gtk-4.0/settings.ini", r"^\s*gtk-icon-theme-name\s*=\s*(.+?)\s*$"),
+        ("gtk-3.0/settings.ini", r"^\s*gtk-icon-theme-name\s*=\s*(.+?)\s*$"),
+        ("kdeglobals", r"^\[Icons\][^\[]*?^Theme=(.+?)\s*$"),
+    ]
+    for name, pattern in probes:
+        try:
+            with open(os.path.join(config, name), "r", encoding="utf-8", errors="replace") as f:
+                m = re.search(pattern, f.read(), re.M | re.S)
+        except OSError:
+            continue
+        if m:
+            return m.group(1).strip("\"'")
+    return DEFAULT_ICON_THEME
+
+
+def icon_name_hash(name):
+    """GTK's icon_name_hash() of a UTF-8 name (bytes as signed chars)."""
+    h = 0
+    for i, c in enumerate(name):
+        if c > 127:
+            c -= 256
+        h = (c if i == 0 else h * 31 + c) & 0xFFFFFFFF
+    return h
+
+
+class IconThemeCache:
+    """Reads a GTK icon-theme.cache file in place through mmap.
+
+    Only the directory list is decoded up front; a lookup hashes the name
+    and follows one bucket chain in the mapping, as GTK does.
+    """
+
+    def __init__(self, path):
+        # Imported here, like other modules the command line rarely needs
+        import mmap
+        import struct
+        self._unpack = struct.unpack_from
+        self._error = struct.error
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            major, _, self._hash_offset, dir_list = self._unpack(">HHII", self._mm, 0)
+            if major != 1:
+                raise ValueError(f"unsupported icon cache version {major}")
+            n_dirs = self._u32(dir_list)
+            self.directories = [self._string(self._u32(dir_list + 4 + 4 * i))
+                                for i in range(n_dirs)]
+            self._n_buckets = self._u32(self._hash_offset)
+        except (ValueError, struct.error) as e:
+            self._mm.close()
+            raise ValueError(f"{path}: {e}")
+
+    def _u32(self, offset):
+        return self._unpack(">I", self._mm, offset)[0]
+
+    def _string(self, offset):
+        return self._mm[offset:self._mm.find(b"\0", offset)].decode("utf-8", "replace")
+
+    def lookup(self, name):
+        """[(directory, extension)] for every image of name, best format
+        first within a directory."""
+        key = name.encode("utf-8") + b"\0"
+        try:
+            offset = self._u32(self._hash_offset + 4
+                               + 4 * (icon_name_hash(key[:-1]) % self._n_buckets))
+            while offset != 0xFFFFFFFF:
+                chain, name_offset, images = self._unpack(">III", self._mm, offset)
+                if self._mm[name_offset:name_offset + len(key)] == key:
+                    result = []
+                    for i in range(self._u32(images)):
+                        d, flags, _ = self._unpack(">HHI", self._mm, images + 4 + 8 * i)
+                        for bit, ext in _CACHE_FLAGS:
+                            if flags & bit:
+                                result.append((self.directories[d], ext))
+                                break
+                    return result
+                offset = chain
+        except (self._error, IndexError, ZeroDivisionError):
+            pass
+        return []
+
+
+class IconDirIndex:
+    """Stand-in for a missing or outdated cache: the theme's directories
+    are listed once into a name -> [(directory, extension)] dict."""
+
+    def __init__(self, theme_path, directories):
+        self.icons = {}
+        for d in directories:
+            try:
+                with os.scandir(os.path.join(theme_path, d)) as it:
+                    names = [e.name for e in it]
+            except OSError:
+                continue
+            profiler.count("icon_dirs_listed")
+            for fname in names:
+                stem, ext = os.path.splitext(fname)
+                if ext in ICON_EXTENSIONS:
+                    self.icons.setdefault(stem, []).append((d, ext))
+        for images in self.icons.values():
+            if len(images) > 1:
+                images.sort(key=lambda image: ICON_EXTENSIONS.index(image[1]))
+
+    def lookup(self, name):
+        return self.icons.get(name, ())
+
+
+class _IconThemeDirs:
+    """One theme: its index.theme and a cache or index per base directory."""
+
+    def __init__(self, name, paths):
+        self.name = name
+        self.inherits = []
+        self.dirs = {}      # subdir -> (size, scale, type, min, max, threshold)
+        self._paths = paths
+        self._sources = None
+        self._stamp = None
+        self._read_index(os.path.join(paths[0], "index.theme"))
+
+    def _read_index(self, path):
+        import configparser
+        parser = configparser.ConfigParser(interpolation=None, strict=False)
+        parser.optionxform = str
+        try:
+            parser.read(path, encoding="utf-8")
+        except (configparser.Error, UnicodeDecodeError):
+            return
+        if not parser.has_section("Icon Theme"):
+            return
+        main = parser["Icon Theme"]
+        self.inherits = [t for t in main.get("Inherits", "").split(",") if t]
+        listed = main.get("Directories", "").split(",") + main.get("ScaledDirectories", "").split(",")
+        for d in listed:
+            if not d or d in self.dirs or not parser.has_section(d):
+                continue
+            group = parser[d]
+            try:
+                size = int(group.get("Size"))
+                scale = int(group.get("Scale", 1))
+                threshold = int(group.get("Threshold", 2))
+                lo = int(group.get("MinSize", size))
+                hi = int(group.get("MaxSize", size))
+            except (TypeError, ValueError):
+                continue
+            self.dirs[d] = (size, scale, group.get("Type", "Threshold"), lo, hi, threshold)
+
+    def sources(self):
+        if self._sources is None:
+            self._stamp = self._current_stamp()
+            self._sources = [(path, self._open_source(path)) for path in self._paths]
+        return self._sources
+
+    def _current_stamp(self):
+        stamp = []
+        for path in self._paths:
+            for p in (path, os.path.join(path, "icon-theme.cache")):
+                try:
+                    st = os.stat(p)
+                    stamp.append((st.st_mtime_ns, st.st_ino))
+                except OSError:
+                    stamp.append(None)
+        return stamp
+
+    def refresh(self):
+        """Drop the caches and indexes if the theme changed on disk;
+        returns whether it did."""
+        if self._sources is None or self._current_stamp() == self._stamp:
+            return False
+        self._sources = None
+        return True
+
+    def _open_source(self, path):
+        cache = os.path.join(path, "icon-theme.cache")
+        try:
+            # Like GTK, ignore a cache older than its theme directory
+            if os.stat(cache).st_mtime >= os.stat(path).st_mtime:
+                return IconThemeCache(cache)
+        except (OSError, ValueError):
+            pass
+        with profiler.span("icon_dir_index"):
+            return IconDirIndex(path, self.dirs)
+
+    def lookup(self, name, size, scale):
+        """Exact-size match, else the closest size this theme has."""
+        best, best_distance = None, None
+        for path, source in self.sources():
+            for subdir, ext in source.lookup(name):
+                d = self.dirs.get(subdir)
+                if d is None:
+                    continue
+                distance = _size_distance(d, size, scale)
+                if distance == 0:
+                    return os.path.join(path, subdir, name + ext)
+                if best is None or distance < best_distance:
+                    best = os.path.join(path, subdir, name + ext)
+                    best_distance = distance
+        return best
+
+
+def _size_distance(d, size, scale):
+    """0 if a theme directory matches the size, else how far off it is
+    (the icon theme spec's DirectoryMatchesSize/DirectorySizeDistance)."""
+    dir_size, dir_scale, kind, lo, hi, threshold = d
+    if kind == "Fixed":
+        lo = hi = dir_size
+    elif kind != "Scalable":
+        lo, hi = dir_size - threshold, dir_size + threshold
+    if dir_scale == scale and lo <= size <= hi:
+        return 0
+    want = size * scale
+    if want < lo * dir_scale:
+        return lo * dir_scale - want
+    if want > hi * dir_scale:
+        return want - hi * dir_scale
+    return 1                # right size, wrong scale
+
+
+class IconTheme:
+    """Resolves icon names to files the way GTK does, without GTK.
+
+    The theme, the themes it inherits and hicolor are searched in order;
+    each theme directory is read through its icon-theme.cache, or listed
+    once when it has none. /usr/share/pixmaps and friends come last.
+    Results are memoized, so repeated lookups are a dict hit.
+    """
+
+    def __init__(self, name=None, base_dirs=None):
+        self.name = name or detect_icon_theme()
+        self.base_dirs = base_dirs or get_icon_base_dirs()
+        self.chain = []
+        self._seen = set()
+        self._add_theme(self.name)
+        self._add_theme("hicolor")
+        self._pixmaps = None
+        self._memo = {}
+
+    def _add_theme(self, name):
+        if name in self._seen:
+            return
+        self._seen.add(name)
+        paths = [os.path.join(b, name) for b in self.base_dirs]
+        paths = [p for p in paths if os.path.isdir(p)]
+        index = [p for p in paths if os.path.isfile(os.path.join(p, "index.theme"))]
+        if not index:
+            return
+        # index.theme comes from the first base dir that has one
+        theme = _IconThemeDirs(name, index[:1] + [p for p in paths if p != index[0]])
+        self.chain.append(theme)
+        for parent in theme.inherits:
+            self._add_theme(parent)
+
+    def resolve(self, name, size=48, scale=1):
+        """(path, themed) for an icon name: the best file, or None, and
+        whether the theme itself has the name (so GTK finds it too)."""
+        key = (name, size, scale)
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        has_ext = name.endswith(ICON_EXTENSIONS)
+        stem = name[:-4] if has_ext else name
+        result = None, False
+        for theme in self.chain:
+            path = theme.lookup(stem, size, scale)
+            if path:
+                result = path, not has_ext
+                break
+        else:
+            result = self._pixmap(name), False
+        self._memo[key] = result
+        return result
+
+    def lookup(self, name, size=48, scale=1):
+        """Path of the best file for an icon name, or None."""
+        return self.resolve(name, size, scale)[0]
+
+    def has_icon(self, name):
+        return self.lookup(name) is not None
+
+    def refresh(self):
+        """Pick up icons installed since the theme was read (e.g. after
+        an icon cache update). Cheap: a few stat() calls."""
+        changed = [theme.refresh() for theme in self.chain]
+        if any(changed) or self._pixmaps is not None:
+            self._pixmaps = None
+            self._memo.clear()
+
+    def _pixmap(self, name):
+        if self._pixmaps is None:
+            self._pixmaps = {}
+            for d in reversed(_data_subdirs("pixmaps")):
+                try:
+                    with os.scandir(d) as it:
+                        for e in it:
+                            stem, ext = os.path.splitext(e.name)
+                            if ext in ICON_EXTENSIONS:
+                                self._pixmaps[stem] = e.path
+                                self._pixmaps[e.name] = e.path
+                except OSError:
+                    continue
+        return self._pixmaps.get(name)
 
-class MainWindow(Adw.ApplicationWindow):
-    def __init__(self, i18n, **kwargs):
-        super().__init__(**kwargs)
-        self.i18n = i18n
-        self.selected_icon_path = None
-        self.file_target_path = None
-        self.selected_app_info = None
-        self.apps_list = find_installed_apps()
 
-        self.set_default_size(700, 680)
-        self._build_ui()
+_icon_themes = {}
 
-    def t(self, key):
-        return self.i18n.t(key)
 
-    def _build_ui(self):
-        self.set_title(self.t("app_title"))
+def get_icon_theme(name=None):
+    """Shared IconTheme for a theme name (default: the session's)."""
+    name = name or detect_icon_theme()
+    theme = _icon_themes.get(name)
+    if theme is None:
+        theme = _icon_themes[name] = IconTheme(name)
+    return theme
 
-        main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
 
-        # ── Header ──
-        header = Adw.HeaderBar()
-        header.add_css_class("flat")
+# ─────────────────────────────────────────────
+#  File icons
+# ─────────────────────────────────────────────
 
-        # Language toggle button
-        self.lang_btn = Gtk.Button()
-        self._update_lang_button()
-        self.lang_btn.connect("clicked", self.on_toggle_language)
-        header.pack_end(self.lang_btn)
+# Thumbnail sizes tried in order; large (256 px) suits desktop icons best
+THUMBNAIL_SIZES = ("large", "x-large", "xx-large", "normal")
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class MimeDatabase:
+    """File names to content types to icon names, from shared-mime-info.
+
+    The globs2, icons and generic-icons files of every data dir are read
+    once. Lookups are memoized per extension and per type, so naming the
+    icons for a batch of thousands of files costs a dict hit each.
+    """
+
+    def __init__(self, data_dirs=None):
+        self.literals = {}          # file name -> type
+        self.suffixes = {}          # ".ext", lowercased -> type
+        self.suffixes_cs = {}       # ".Ext", case-sensitive -> type
+        self.patterns = []          # (glob, type, case_sensitive)
+        self.icons = {}
+        self.generic_icons = {}
+        self._type_memo = {}
+        self._icon_memo = {}
+        # Lowest precedence first, so $XDG_DATA_HOME wins
+        for d in reversed(data_dirs or get_data_dirs()):
+            self._read_dir(os.path.join(d, "mime"))
+
+    def _read_dir(self, mime_dir):
+        globs = {}
+        for fields in self._read_lines(os.path.join(mime_dir, "globs2")):
+            if len(fields) < 3:
+                continue
+            try:
+                weight = int(fields[0])
+            except ValueError:
+                continue
+            mime, glob = fields[1], fields[2]
+            cs = len(fields) > 3 and "cs" in fields[3].split(",")
+            key = (glob if cs else glob.lower(), cs)
+            # The file is sorted by weight; the first entry for a glob wins
+            if key not in globs or weight > globs[key][0]:
+                globs[key] = (weight, mime)
+        for (glob, cs), (_, mime) in globs.items():
+            if glob.startswith("*.") and not any(c in glob[1:] for c in "*?["):
+                (self.suffixes_cs if cs else self.suffixes)[glob[1:]] = mime
+            elif not any(c in glob for c in "*?["):
+                self.literals[glob if cs else glob.lower()] = mime
+            else:
+                self.patterns.append((glob, mime, cs))
+        for name, table in (("icons", self.icons), ("generic-icons", self.generic_icons)):
+            for fields in self._read_lines(os.path.join(mime_dir, name)):
+                if len(fields) == 3:
+                    table[fields[0] + ":" + fields[1]] = fields[2]
+                elif len(fields) == 2:
+                    table[fields[0]] = fields[1]
+
+    @staticmethod
+    def _read_lines(path):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    if line.strip() and not line.startswith("#"):
+                        yield line.rstrip("\n").split(":")
+        except OSError:
+            return
 
-        # About button
-        about_btn = Gtk.Button()
-        about_btn.set_icon_name("help-about-symbolic")
-        about_btn.set_tooltip_text("About")
-        about_btn.connect("clicked", self.on_about)
-        header.pack_end(about_btn)
+    def guess_type(self, name):
+        """Content type from a file name alone, or None."""
+        mime = self.literals.get(name) or self.literals.get(name.lower())
+        if mime:
+            return mime
+        dot = name.find(".", 1)
+        ext = name[dot:] if dot > 0 else ""
+        try:
+            mime = self._type_memo[ext]
+        except KeyError:
+            mime = self._type_memo[ext] = self._match_suffix(ext)
+        if mime:
+            return mime
+        lower = name.lower()
+        for glob, mime, cs in self.patterns:
+            if fnmatch.fnmatchcase(name if cs else lower, glob):
+                return mime
+        return None
+
+    def _match_suffix(self, ext):
+        # Longest suffix first: ".tar.gz" before ".gz"
+        while ext:
+            mime = self.suffixes_cs.get(ext) or self.suffixes.get(ext.lower())
+            if mime:
+                return mime
+            dot = ext.find(".", 1)
+            ext = ext[dot:] if dot > 0 else ""
+        return None
+
+    def icon_for_type(self, mime):
+        """Themed icon name for a content type, in the spec's order: the
+        icons file, the type's own name (application-pdf) if the icon
+        theme has it, generic-icons, then <media>-x-generic."""
+        icon = self._icon_memo.get(mime)
+        if icon is None:
+            icon = self.icons.get(mime)
+            if icon is None:
+                own = mime.replace("/", "-")
+                theme = get_icon_theme()
+                # With no theme to check (none visible, e.g. in a sandbox)
+                # the desktop resolves the type's own name itself
+                if not theme.chain or theme.has_icon(own):
+                    icon = own
+                else:
+                    icon = (self.generic_icons.get(mime)
+                            or mime.partition("/")[0] + "-x-generic")
+            self._icon_memo[mime] = icon
+        return icon
+
+
+_mime_db = None
+
+
+def get_mime_database():
+    global _mime_db
+    if _mime_db is None:
+        with profiler.span("mime_load"):
+            _mime_db = MimeDatabase()
+    return _mime_db
+
+
+def sniff_type(path):
+    """Content type of a file no glob matched: text unless it has NULs."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(256)
+    except OSError:
+        return "application/octet-stream"
+    return "application/octet-stream" if b"\0" in head else "text/plain"
 
-        main_box.append(header)
 
-        # ── View Stack ──
-        self.stack = Adw.ViewStack()
+def _thumbnail_mtime(path):
+    """Thumb::MTime of a thumbnail PNG, reading only the chunks before the
+    image data."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(8) != _PNG_SIGNATURE:
+                return None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return None
+                length = int.from_bytes(header[:4], "big")
+                kind = header[4:]
+                if kind == b"IDAT" or kind == b"IEND":
+                    return None
+                if kind != b"tEXt":
+                    f.seek(length + 4, os.SEEK_CUR)
+                    continue
+                key, _, value = f.read(length).partition(b"\0")
+                f.seek(4, os.SEEK_CUR)
+                if key == b"Thumb::MTime":
+                    return int(value)
+    except (OSError, ValueError):
+        return None
 
-        top_switcher = Adw.ViewSwitcher()
-        top_switcher.set_stack(self.stack)
-        top_switcher.set_policy(Adw.ViewSwitcherPolicy.WIDE)
-        header.set_title_widget(top_switcher)
 
-        tab_bar = Adw.ViewSwitcherBar()
-        tab_bar.set_stack(self.stack)
-        tab_bar.set_reveal(True)
+def find_thumbnail(path):
+    """Path of an up-to-date freedesktop thumbnail of path, or None.
 
-        # Build tabs
-        self.file_page_content = self._build_file_tab()
-        self.app_page_content = self._build_app_tab()
+    Thumbnails are looked up by the MD5 of the file's URI; only their
+    header is read, and the file itself is never opened.
+    """
+    path = os.path.abspath(path)
+    try:
+        mtime = int(os.stat(path).st_mtime)
+    except OSError:
+        return None
+    import hashlib
+    from urllib.parse import quote
+    uri = "file://" + quote(os.fsencode(path), safe="/!$&'()*+,;=:@")
+    name = hashlib.md5(uri.encode("ascii")).hexdigest() + ".png"
+    base = os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache"), "thumbnails"
+    )
+    for size in THUMBNAIL_SIZES:
+        thumb = os.path.join(base, size, name)
+        if _thumbnail_mtime(thumb) == mtime:
+            profiler.count("thumbnails_reused")
+            return thumb
+    return None
+
+
+def file_icon(target):
+    """Icon for a shortcut to target: an existing thumbnail for images and
+    videos, otherwise the themed icon of its content type.
+
+    The thumbnail cache gets cleaned up, so a thumbnail is copied into
+    the icon store (see import_thumbnail) instead of being referenced there.
+    """
+    if target.is_dir():
+        return "folder"
+    db = get_mime_database()
+    mime = db.guess_type(target.name) or sniff_type(target)
+    if mime.startswith(("image/", "video/")):
+        thumb = find_thumbnail(target)
+        icon = thumb and import_thumbnail(thumb)
+        if icon:
+            return icon
+    return db.icon_for_type(mime)
+
+
+# Custom icons are imported into the user's hicolor theme at these sizes
+ICON_STORE_SIZES = (32, 48, 64, 128)
+ICON_STORE_PREFIX = "desktop-linker-"
+_imported_icons = {}    # (path, mtime_ns, size, inode) -> icon name
+
+
+def get_icon_store_dir():
+    """The user's hicolor theme ($XDG_DATA_HOME/icons/hicolor)."""
+    home = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local/share")
+    return Path(home) / "icons" / "hicolor"
+
+
+def _content_hash(path):
+    import hashlib
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def import_icon(path):
+    """Store a custom icon image in the user's icon theme; return its name.
+
+    The image is named after a hash of its content, so importing the same
+    image again (from any path) reuses the stored renditions without
+    decoding anything. It is decoded once and saved as square PNGs at
+    ICON_STORE_SIZES, so desktops render a small file of the right size
+    instead of the original, which may be large or on a removable drive.
+    Returns path unchanged if the image cannot be decoded here (e.g. no
+    GdkPixbuf).
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return path
+    memo_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, st.st_ino)
+    name = _imported_icons.get(memo_key)
+    if name:
+        return name
+
+    with profiler.span("icon_import"):
+        try:
+            name = ICON_STORE_PREFIX + _content_hash(path)
+        except OSError:
+            return path
+        store = get_icon_store_dir()
+        targets = [store / f"{s}x{s}" / "apps" / f"{name}.png" for s in ICON_STORE_SIZES]
+        if all(t.exists() for t in targets):
+            profiler.count("icon_store_hits")
+        elif not _render_icon(path, targets):
+            return path
+        else:
+            profiler.count("icons_imported")
+            _touch_store(store)
+    _imported_icons[memo_key] = name
+    return name
+
+
+def import_thumbnail(path):
+    """Copy a freedesktop thumbnail into the icon store; return its name.
+
+    Thumbnails already are PNGs of at most 256 px, so unlike import_icon()
+    nothing is decoded: the file is stored as is under the hash of its
+    bytes, in the 128 or 256 px directory. None if it cannot be read.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    memo_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, st.st_ino)
+    name = _imported_icons.get(memo_key)
+    if name:
+        return name
+
+    import hashlib
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < 24 or not data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return None
+    size = 128 if max(int.from_bytes(data[16:20], "big"),
+                      int.from_bytes(data[20:24], "big")) <= 128 else 256
+    name = ICON_STORE_PREFIX + hashlib.sha256(data).hexdigest()[:16]
+    store = get_icon_store_dir()
+    target = store / f"{size}x{size}" / "apps" / f"{name}.png"
+    if target.exists():
+        profiler.count("icon_store_hits")
+    else:
+        tmp = target.with_name(f".{target.name}.{os.getpid()}-{next(_TMP_COUNTER)}.tmp")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, target)
+        except OSError:
+            _unlink_quietly(tmp)
+            return None
+        profiler.count("thumbnails_imported")
+        _touch_store(store)
+    _imported_icons[memo_key] = name
+    return name
+
+
+def _touch_store(store):
+    # Icon caches older than the theme directory are ignored, so new or
+    # removed files are picked up without rebuilding the cache
+    try:
+        os.utime(store)
+    except OSError:
+        pass
 
-        self.file_stack_page = self.stack.add_titled_with_icon(
-            self.file_page_content, "files",
-            self.t("tab_files"), "folder-symbolic"
-        )
-        self.app_stack_page = self.stack.add_titled_with_icon(
-            self.app_page_content, "apps",
-            self.t("tab_apps"), "application-x-executable-symbolic"
-        )
 
-        main_box.append(self.stack)
-        main_box.append(tab_bar)
-
-        # ── Toast overlay ──
-        self.toast_overlay = Adw.ToastOverlay()
-        self.set_content(self.toast_overlay)
-        self.toast_overlay.set_child(main_box)
-
-    # ────────────────────────────────────────────
-    #  TAB 1 – File / Folder
-    # ────────────────────────────────────────────
-    def _build_file_tab(self):
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=16)
-        box.set_margin_top(16)
-        box.set_margin_bottom(16)
-        box.set_margin_start(16)
-        box.set_margin_end(16)
-
-        # Drop area
-        self.drop_label = Gtk.Label(label=self.t("drop_hint"))
-        self.drop_label.set_justify(Gtk.Justification.CENTER)
-        self.drop_label.add_css_class("dim-label")
-
-        self.drop_area = Gtk.Frame()
-        self.drop_area.set_size_request(-1, 120)
-
-        drop_inner = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
-        drop_inner.set_valign(Gtk.Align.CENTER)
-        drop_inner.set_halign(Gtk.Align.CENTER)
-
-        drop_icon = Gtk.Image.new_from_icon_name("document-send-symbolic")
-        drop_icon.set_pixel_size(48)
-        drop_icon.add_css_class("dim-label")
-        drop_inner.append(drop_icon)
-        drop_inner.append(self.drop_label)
-        self.drop_area.set_child(drop_inner)
-
-        drop_target = Gtk.DropTarget.new(Gio.File, Gdk.DragAction.COPY)
-        drop_target.connect("drop", self.on_file_drop)
-        drop_target.connect("enter", lambda *_: Gdk.DragAction.COPY)
-        self.drop_area.add_controller(drop_target)
-        box.append(self.drop_area)
-
-        # Path row
-        self.file_path_row = Adw.ActionRow()
-        self.file_path_row.set_title(self.t("no_path"))
-        self.file_path_row.set_subtitle(self.t("select_file_folder"))
-        self.file_path_row.add_css_class("property")
-
-        self.btn_choose_file = Gtk.Button(label=self.t("btn_choose_file"))
-        self.btn_choose_file.set_valign(Gtk.Align.CENTER)
-        self.btn_choose_file.connect("clicked", self.on_choose_file)
-
-        self.btn_choose_folder = Gtk.Button(label=self.t("btn_choose_folder"))
-        self.btn_choose_folder.set_valign(Gtk.Align.CENTER)
-        self.btn_choose_folder.connect("clicked", self.on_choose_folder)
-
-        self.file_path_row.add_suffix(self.btn_choose_file)
-        self.file_path_row.add_suffix(self.btn_choose_folder)
-
-        # Name entry
-        self.file_name_entry = Adw.EntryRow()
-        self.file_name_entry.set_title(self.t("shortcut_name"))
-
-        # Icon row
-        self.file_icon_row = self._build_icon_row("file")
-
-        self.file_group = Adw.PreferencesGroup()
-        self.file_group.set_title(self.t("configure_shortcut"))
-        self.file_group.add(self.file_path_row)
-        self.file_group.add(self.file_name_entry)
-        self.file_group.add(self.file_icon_row)
-        box.append(self.file_group)
-
-        self.btn_create_file = Gtk.Button(label=self.t("btn_create_file"))
-        self.btn_create_file.add_css_class("suggested-action")
-        self.btn_create_file.add_css_class("pill")
-        self.btn_create_file.set_halign(Gtk.Align.CENTER)
-        self.btn_create_file.connect("clicked", self.on_create_file_shortcut)
-        box.append(self.btn_create_file)
-
-        return box
-
-    # ────────────────────────────────────────────
-    #  TAB 2 – Apps
-    # ────────────────────────────────────────────
-    def _build_app_tab(self):
-        outer_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
-        outer_box.set_margin_top(16)
-        outer_box.set_margin_bottom(16)
-        outer_box.set_margin_start(16)
-        outer_box.set_margin_end(16)
-
-        self.app_search = Gtk.SearchEntry()
-        self.app_search.set_placeholder_text(self.t("search_placeholder"))
-        self.app_search.connect("search-changed", self.on_app_search_changed)
-        outer_box.append(self.app_search)
-
-        paned = Gtk.Paned(orientation=Gtk.Orientation.VERTICAL)
-        paned.set_vexpand(True)
-        paned.set_wide_handle(True)
-        outer_box.append(paned)
-
-        scroll = Gtk.ScrolledWindow()
-        scroll.set_vexpand(True)
-        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scroll.set_min_content_height(180)
-
-        self.app_list_box = Gtk.ListBox()
-        self.app_list_box.set_selection_mode(Gtk.SelectionMode.SINGLE)
-        self.app_list_box.add_css_class("boxed-list")
-        self.app_list_box.connect("row-selected", self.on_app_selected)
-
-        self._populate_app_list(self.apps_list)
-        scroll.set_child(self.app_list_box)
-        paned.set_start_child(scroll)
-        paned.set_shrink_start_child(False)
-
-        bottom_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
-        bottom_box.set_margin_top(8)
-
-        self.app_name_entry = Adw.EntryRow()
-        self.app_name_entry.set_title(self.t("shortcut_name") + " (optional)")
-
-        self.app_icon_row = self._build_icon_row("app")
-
-        self.app_config_group = Adw.PreferencesGroup()
-        self.app_config_group.set_title(self.t("configure_shortcut"))
-        self.app_config_group.add(self.app_name_entry)
-        self.app_config_group.add(self.app_icon_row)
-        bottom_box.append(self.app_config_group)
-
-        self.btn_create_app = Gtk.Button(label=self.t("btn_create_app"))
-        self.btn_create_app.add_css_class("suggested-action")
-        self.btn_create_app.add_css_class("pill")
-        self.btn_create_app.set_halign(Gtk.Align.CENTER)
-        self.btn_create_app.connect("clicked", self.on_create_app_shortcut)
-        bottom_box.append(self.btn_create_app)
-
-        paned.set_end_child(bottom_box)
-        paned.set_shrink_end_child(False)
-        paned.set_position(320)
-
-        return outer_box
-
-    def _populate_app_list(self, apps):
+def prune_icon_store(in_use, min_age=24 * 3600):
+    """Delete stored icons (imported images and thumbnails) whose name is
+    not in in_use; returns their paths. Icons younger than min_age seconds
+    are kept, as a shortcut being created may be about to use them."""
+    store = get_icon_store_dir()
+    deadline = time.time() - min_age
+    removed = []
+    gone = set()
+    try:
+        size_dirs = [e.path for e in os.scandir(store) if e.is_dir()]
+    except OSError:
+        return removed
+    for size_dir in size_dirs:
+        try:
+            entries = list(os.scandir(os.path.join(size_dir, "apps")))
+        except OSError:
+            continue
+        for e in entries:
+            name = e.name[:-4]
+            if (not e.name.startswith(ICON_STORE_PREFIX) or not e.name.endswith(".png")
+                    or name in in_use):
+                continue
+            try:
+                if e.stat().st_mtime > deadline:
+                    continue
+                os.unlink(e.path)
+            except OSError:
+                continue
+            removed.append(e.path)
+            gone.add(name)
+    if gone:
+        for key in [k for k, v in _imported_icons.items() if v in gone]:
+            del _imported_icons[key]
+        _touch_store(store)
+    return removed
+
+
+def _render_icon(path, targets):
+    """Decode path once and write a square PNG per ICON_STORE_SIZES entry."""
+    try:
+        import gi
+        gi.require_version("GdkPixbuf", "2.0")
+        from gi.repository import GdkPixbuf
+    except (ImportError, ValueError):
+        return False
+    largest = max(ICON_STORE_SIZES)
+    try:
+        # Scaled while decoding; vector images are rendered at this size
+        image = GdkPixbuf.Pixbuf.new_from_file_at_scale(str(path), largest, largest, True)
+        if not image.get_has_alpha():
+            image = image.add_alpha(False, 0, 0, 0)
+        for size, target in zip(ICON_STORE_SIZES, targets):
+            scale = size / max(image.get_width(), image.get_height())
+            w = max(1, round(image.get_width() * scale))
+            h = max(1, round(image.get_height() * scale))
+            scaled = image if (w, h) == (image.get_width(), image.get_height()) \
+                else image.scale_simple(w, h, GdkPixbuf.InterpType.HYPER)
+            icon = GdkPixbuf.Pixbuf.new(GdkPixbuf.Colorspace.RGB, True, 8, size, size)
+            icon.fill(0)
+            scaled.copy_area(0, 0, w, h, icon, (size - w) // 2, (size - h) // 2)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Shortcut batches import thumbnails from several threads
+            tmp = target.with_name(f".{target.name}.{os.getpid()}-{next(_TMP_COUNTER)}.tmp")
+            try:
+                icon.savev(str(tmp), "png", [], [])
+                os.replace(tmp, target)
+            except BaseException:
+                _unlink_quietly(tmp)
+                raise
+    except Exception:
+        return False
+    return True
+
+
+def shortcut_icon(icon_path):
+    """The Icon= value for a user-chosen icon: image files are imported
+    into the icon store, icon names are kept."""
+    if icon_path and os.path.isfile(icon_path):
+        return import_icon(icon_path)
+    return icon_path
+
+
+_TMP_COUNTER = itertools.count()
+_TMP_PREFIX = ".desktop-linker-"
+_KEY_RE = re.compile(rb"[ \t]*([A-Za-z0-9-]+)[ \t]*(\[[^\]\r\n]*\])?[ \t]*=")
+
+
+class NameAllocator:
+    """Hands out collision-free shortcut file names in one directory.
+
+    The directory is listed once; names handed out afterwards are tracked
+    in memory, so a batch costs no extra stat() calls. A finished shortcut
+    is published with link(), which fails instead of overwriting, so
+    concurrent instances never replace each other's files and a shortcut
+    never appears half-written. Not thread-safe.
+    """
+    # Temp files this old were left by a process killed before publishing
+    STALE_TEMP_AGE = 600
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.taken = set(os.listdir(self.directory))
+        self._next = {}
+        self._unsynced = False
+        self._remove_stale_temps()
+
+    def _remove_stale_temps(self):
+        deadline = time.time() - self.STALE_TEMP_AGE
+        for name in self.taken:
+            if name.startswith(_TMP_PREFIX) and name.endswith(".tmp"):
+                path = self.directory / name
+                try:
+                    if os.stat(path).st_mtime < deadline:
+                        os.unlink(path)
+                except OSError:
+                    pass
+
+    def _candidates(self, name, suffix):
+        counter = self._next.get((name, suffix), 0)
         while True:
-            row = self.app_list_box.get_row_at_index(0)
-            if row is None:
-                break
-            self.app_list_box.remove(row)
-
-        for app in apps:
-            row = Adw.ActionRow()
-            row.set_title(app.get("Name", self.t("unknown_app")))
-            comment = app.get("Comment", app.get("GenericName", ""))
-            if comment:
-                row.set_subtitle(comment)
-
-            icon_name = app.get("Icon", "application-x-executable")
-            img = Gtk.Image()
-            img.set_pixel_size(32)
-            if os.path.isfile(icon_name):
-                img.set_from_file(icon_name)
+            candidate = f"{name}_{counter}{suffix}" if counter else f"{name}{suffix}"
+            counter += 1
+            if candidate in self.taken:
+                continue
+            self.taken.add(candidate)
+            self._next[(name, suffix)] = counter
+            yield self.directory / candidate
+
+    @staticmethod
+    def _create_exclusive(path):
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return False
+        os.close(fd)
+        return True
+
+    def publish(self, tmp_path, name, suffix=".desktop"):
+        """Give a finished temp file in the directory a free name; return it."""
+        for path in self._candidates(name, suffix):
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                continue
+            except OSError:
+                # No hard links here (e.g. FAT): claim the name with O_EXCL
+                # and move the finished file over the empty placeholder
+                if not self._create_exclusive(path):
+                    continue
+                os.replace(tmp_path, path)
             else:
-                img.set_from_icon_name(icon_name)
-            row.add_prefix(img)
-            row._app_info = app
-            self.app_list_box.append(row)
-
-    def _build_icon_row(self, prefix):
-        row = Adw.ActionRow()
-        row.set_title(self.t("custom_icon"))
-        row.set_subtitle(self.t("no_icon"))
-
-        preview = Gtk.Image()
-        preview.set_pixel_size(32)
-        row.add_prefix(preview)
-
-        btn_icon = Gtk.Button(label=self.t("btn_choose_icon"))
-        btn_icon.set_valign(Gtk.Align.CENTER)
-        btn_icon.connect("clicked", lambda *_: self.on_choose_icon(row, preview))
-
-        btn_clear = Gtk.Button()
-        btn_clear.set_icon_name("edit-clear-symbolic")
-        btn_clear.set_valign(Gtk.Align.CENTER)
-        btn_clear.set_tooltip_text(self.t("btn_clear_icon"))
-        btn_clear.connect("clicked", lambda *_: self.on_clear_icon(row, preview))
-
-        row.add_suffix(btn_icon)
-        row.add_suffix(btn_clear)
-
-        # Store references for language updates
-        row._btn_icon = btn_icon
-        row._btn_clear = btn_clear
-        row._preview = preview
-
-        return row
-
-    # ────────────────────────────────────────────
-    #  Language switching
-    # ────────────────────────────────────────────
-    def on_toggle_language(self, btn):
-        self.i18n.switch()
-        self._update_all_labels()
-        self._update_lang_button()
-
-    def _update_lang_button(self):
-        # Show flag of the OTHER language (the one you'd switch TO)
-        flag = "🇩🇪" if self.i18n.lang == "en" else "🇬🇧"
-        self.lang_btn.set_label(flag)
-        self.lang_btn.set_tooltip_text(self.t("lang_button_tooltip"))
-
-    def _update_all_labels(self):
-        """Update all UI strings after language switch."""
-        self.set_title(self.t("app_title"))
-
-        # Tab titles
-        self.file_stack_page.set_title(self.t("tab_files"))
-        self.app_stack_page.set_title(self.t("tab_apps"))
-
-        # File tab
-        self.drop_label.set_label(self.t("drop_hint"))
-        if not self.file_target_path:
-            self.file_path_row.set_title(self.t("no_path"))
-            self.file_path_row.set_subtitle(self.t("select_file_folder"))
-        self.btn_choose_file.set_label(self.t("btn_choose_file"))
-        self.btn_choose_folder.set_label(self.t("btn_choose_folder"))
-        self.file_name_entry.set_title(self.t("shortcut_name"))
-        self.file_group.set_title(self.t("configure_shortcut"))
-        self.btn_create_file.set_label(self.t("btn_create_file"))
-
-        # File icon row
-        self.file_icon_row.set_title(self.t("custom_icon"))
-        if not self.file_icon_row._preview.get_paintable():
-            self.file_icon_row.set_subtitle(self.t("no_icon"))
-        self.file_icon_row._btn_icon.set_label(self.t("btn_choose_icon"))
-        self.file_icon_row._btn_clear.set_tooltip_text(self.t("btn_clear_icon"))
-
-        # App tab
-        self.app_search.set_placeholder_text(self.t("search_placeholder"))
-        self.app_name_entry.set_title(self.t("shortcut_name") + " (optional)")
-        self.app_config_group.set_title(self.t("configure_shortcut"))
-        self.btn_create_app.set_label(self.t("btn_create_app"))
-
-        # App icon row
-        self.app_icon_row.set_title(self.t("custom_icon"))
-        if not self.app_icon_row._preview.get_paintable():
-            self.app_icon_row.set_subtitle(self.t("no_icon"))
-        self.app_icon_row._btn_icon.set_label(self.t("btn_choose_icon"))
-        self.app_icon_row._btn_clear.set_tooltip_text(self.t("btn_clear_icon"))
-
-    # ────────────────────────────────────────────
-    #  About dialog
-    # ────────────────────────────────────────────
-    def on_about(self, btn):
-        about = Adw.AboutWindow(transient_for=self)
-        about.set_application_name("Desktop Linker")
-        about.set_version(APP_VERSION)
-        about.set_developer_name(APP_DEVELOPER)
-        about.set_comments(self.t("about_app"))
-        about.set_license_type(Gtk.License.MIT_X11)
-        about.set_application_icon("insert-link")
-        about.present()
-
-    # ────────────────────────────────────────────
-    #  Signal handlers
-    # ────────────────────────────────────────────
-    def on_file_drop(self, drop_target, value, x, y):
-        if isinstance(value, Gio.File):
-            path = value.get_path()
-            if path:
-                self._set_file_path(path)
-                return True
-        return False
+                os.unlink(tmp_path)
+            self._unsynced = True
+            return path
+
+    def replace(self, tmp_path, path):
+        """Atomically put a finished temp file in place of an existing one."""
+        os.replace(tmp_path, path)
+        self._unsynced = True
+
+    def sync(self):
+        """fsync the directory once for everything published so far."""
+        if not self._unsynced:
+            return
+        self._unsynced = False
+        try:
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
 
-    def _set_file_path(self, path):
-        self.file_target_path = path
-        self.file_path_row.set_title(os.path.basename(path))
-        self.file_path_row.set_subtitle(path)
-        if not self.file_name_entry.get_text():
-            self.file_name_entry.set_text(os.path.basename(path))
 
-    def on_choose_file(self, btn):
-        dialog = Gtk.FileDialog()
-        dialog.set_title(self.t("dialog_file_title"))
-        dialog.open(self, None, self._on_file_chosen)
+def _write_temp(directory, data):
+    """Write data to a new hidden file in directory and fsync it.
 
-    def _on_file_chosen(self, dialog, result):
+    The file is created executable, as desktops require for launchers, so
+    it is complete in every respect before it gets its visible name.
+    """
+    while True:
+        tmp = Path(directory) / f"{_TMP_PREFIX}{os.getpid()}-{next(_TMP_COUNTER)}.tmp"
         try:
-            f = dialog.open_finish(result)
-            if f:
-                self._set_file_path(f.get_path())
-        except GLib.Error:
-            pass
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o744)
+            break
+        except FileExistsError:
+            continue
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fdatasync(f.fileno())
+    except BaseException:
+        _unlink_quietly(tmp)
+        raise
+    return tmp
 
-    def on_choose_folder(self, btn):
-        dialog = Gtk.FileDialog()
-        dialog.set_title(self.t("dialog_folder_title"))
-        dialog.select_folder(self, None, self._on_folder_chosen)
 
-    def _on_folder_chosen(self, dialog, result):
-        try:
-            f = dialog.select_folder_finish(result)
-            if f:
-                self._set_file_path(f.get_path())
-        except GLib.Error:
-            pass
+def _unlink_quietly(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
 
-    def on_choose_icon(self, row, preview):
-        dialog = Gtk.FileDialog()
-        dialog.set_title(self.t("dialog_icon_title"))
-        filter_img = Gtk.FileFilter()
-        filter_img.set_name(self.t("filter_images"))
-        filter_img.add_mime_type("image/png")
-        filter_img.add_mime_type("image/svg+xml")
-        filter_img.add_mime_type("image/x-xpixmap")
-        filters = Gio.ListStore.new(Gtk.FileFilter)
-        filters.append(filter_img)
-        dialog.set_filters(filters)
-        dialog.open(self, None, lambda d, r: self._on_icon_chosen(d, r, row, preview))
-
-    def _on_icon_chosen(self, dialog, result, row, preview):
-        try:
-            f = dialog.open_finish(result)
-            if f:
-                path = f.get_path()
-                self.selected_icon_path = path
-                row.set_subtitle(os.path.basename(path))
-                preview.set_from_file(path)
-        except GLib.Error:
-            pass
 
-    def on_clear_icon(self, row, preview):
-        self.selected_icon_path = None
-        row.set_subtitle(self.t("no_icon"))
-        preview.clear()
-
-    def on_app_search_changed(self, entry):
-        text = entry.get_text().lower()
-        filtered = [
-            a for a in self.apps_list
-            if not text
-            or text in a.get("Name", "").lower()
-            or text in a.get("Comment", "").lower()
-            or text in a.get("GenericName", "").lower()
-        ]
-        self._populate_app_list(filtered)
+def _publish_shortcut(allocator, name, data):
+    tmp = _write_temp(allocator.directory, data)
+    try:
+        path = allocator.publish(tmp, name)
+    except BaseException:
+        _unlink_quietly(tmp)
+        raise
+    profiler.count("shortcuts_created")
+    return path
+
+
+def rewrite_desktop_entry(data, overrides):
+    """Return data with keys of the [Desktop Entry] group replaced.
+
+    overrides maps keys to new values (None removes the key). Localized
+    variants of an overridden key are dropped, keys that are missing are
+    added at the end of the group, and everything else, including action
+    groups, comments and line endings, is passed through unchanged.
+    """
+    if data.startswith(b"\xef\xbb\xbf"):
+        data = data[3:]
+    lines = data.splitlines(keepends=True)
+    nl = b"\r\n" if lines and lines[0].endswith(b"\r\n") else b"\n"
+    out = []
+    in_entry = False
+
+    def end_entry():
+        # New keys go before the blank lines that separate the groups
+        blank = []
+        while out and not out[-1].strip():
+            blank.append(out.pop())
+        if out and not out[-1].endswith(b"\n"):
+            out[-1] += nl
+        for key, value in overrides.items():
+            if value is not None:
+                out.append(f"{key}={escape_value(value)}".encode("utf-8") + nl)
+        out.extend(reversed(blank))
+
+    for line in lines:
+        stripped = line.lstrip()
+        if stripped.startswith(b"["):
+            if in_entry:
+                end_entry()
+            in_entry = stripped.rstrip() == b"[Desktop Entry]"
+        elif in_entry:
+            m = _KEY_RE.match(line)
+            if m and m.group(1).decode("ascii") in overrides:
+                continue
+        out.append(line)
+    if in_entry:
+        end_entry()
+    return b"".join(out)
+
+
+def _file_shortcut_content(target, name, icon_path=None, extra=None):
+    icon = shortcut_icon(icon_path) or file_icon(target)
+    command = "xdg-open " + quote_exec_arg(str(target))
+
+    return (
+        "[Desktop Entry]\n"
+        "Version=1.0\n"
+        "Type=Application\n"
+        f"Name={escape_value(name)}\n"
+        f"Exec={escape_value(command)}\n"
+        f"Icon={escape_value(icon)}\n"
+        "Terminal=false\n"
+        f"{TARGET_KEY}={escape_value(os.path.abspath(target))}\n"
+        + "".join(f"{k}={escape_value(v)}\n" for k, v in (extra or {}).items())
+    ).encode("utf-8")
 
-    def on_app_selected(self, listbox, row):
-        if row and hasattr(row, "_app_info"):
-            self.selected_app_info = row._app_info
 
-    def on_create_file_shortcut(self, btn):
-        if not self.file_target_path:
-            self.show_toast(self.t("toast_no_file"))
-            return
-        name = self.file_name_entry.get_text().strip() or None
+def create_file_shortcut(target_path, icon_path=None, custom_name=None, allocator=None):
+    """Create a .desktop shortcut for a file or folder.
+
+    With an allocator, several shortcuts can be created in one directory;
+    call its sync() once afterwards to make them durable.
+    """
+    own_allocator = allocator is None
+    allocator = allocator or NameAllocator(get_desktop_dir())
+
+    target = Path(target_path)
+    name = custom_name or target.name
+
+    with profiler.span("create_shortcut"):
+        shortcut_path = _publish_shortcut(
+            allocator, name, _file_shortcut_content(target, name, icon_path)
+        )
+        if own_allocator:
+            allocator.sync()
+    return str(shortcut_path)
+
+
+def create_file_shortcuts(targets, icon_path=None, max_workers=4,
+                          cancel=None, progress=None):
+    """Create shortcuts for many files/folders in one go.
+
+    The desktop directory is resolved and listed once, the files are
+    written by a small worker pool and then published in input order, and
+    the directory is synced once at the end. Returns one (target,
+    shortcut_path, error) tuple per target, in input order; either
+    shortcut_path or error is None.
+
+    progress(done, total) is called from the workers as each file is
+    written, since writing (fsync, icons) is the slow part. Once the
+    cancel event (a threading.Event) is set, the remaining targets are
+    skipped with an InterruptedError.
+    """
+    import threading
+    allocator = NameAllocator(get_desktop_dir())
+    get_mime_database()     # load once, before the workers need them
+    get_icon_theme()
+    icon_path = shortcut_icon(icon_path)
+    done = itertools.count(1)
+    done_lock = threading.Lock()
+
+    def write(target_path):
+        if cancel is not None and cancel.is_set():
+            return None, InterruptedError("cancelled")
         try:
-            path = create_file_shortcut(self.file_target_path, self.selected_icon_path, name)
-            self.show_toast(self.t("toast_created").format(os.path.basename(path)))
+            content = _file_shortcut_content(Path(target_path), Path(target_path).name, icon_path)
+            result = _write_temp(allocator.directory, content), None
         except Exception as e:
-            self.show_toast(self.t("toast_error").format(e))
+            result = None, e
+        if progress is not None:
+            # Held while reporting, so the count never goes backwards
+            with done_lock:
+                progress(next(done), len(targets))
+        return result
+
+    with profiler.span("create_shortcuts"):
+        if len(targets) <= 1:
+            written = [write(t) for t in targets]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                written = list(pool.map(write, targets))
+
+        results = []
+        for target_path, (tmp, error) in zip(targets, written):
+            if error is None and cancel is not None and cancel.is_set():
+                _unlink_quietly(tmp)
+                error = InterruptedError("cancelled")
+            if error is None:
+                try:
+                    path = allocator.publish(tmp, Path(target_path).name)
+                    profiler.count("shortcuts_created")
+                    results.append((target_path, str(path), None))
+                    continue
+                except Exception as e:
+                    _unlink_quietly(tmp)
+                    error = e
+            results.append((target_path, None, error))
+        allocator.sync()
+    return results
+
+
+def create_app_shortcut(desktop_file_path, icon_path=None, custom_name=None,
+                        allocator=None, command=None):
+    """Copy an app .desktop file to the desktop.
+
+    The source is read once and written with the overrides applied: Icon,
+    Name, and with a command, Exec (TryExec is then dropped). The source's
+    desktop-file ID is recorded for ShortcutIndex. The allocator works as
+    in create_file_shortcut().
+    """
+    own_allocator = allocator is None
+    allocator = allocator or NameAllocator(get_desktop_dir())
+
+    with profiler.span("create_shortcut"):
+        name, content = _app_shortcut_content(desktop_file_path, icon_path,
+                                              custom_name, command)
+        shortcut_path = _publish_shortcut(allocator, name, content)
+        if own_allocator:
+            allocator.sync()
+    return str(shortcut_path)
+
 
-    def on_create_app_shortcut(self, btn):
-        if not self.selected_app_info:
-            self.show_toast(self.t("toast_no_app"))
+def _app_shortcut_content(desktop_file_path, icon_path=None, custom_name=None,
+                          command=None, extra=None):
+    """Return (name, content) for a shortcut copied from an app entry."""
+    with open(desktop_file_path, "rb") as f:
+        data = f.read()
+    info = _parse_entry_group(
+        _read_desktop_entry_group(io.BytesIO(data)), ("Name",), desktop_locale()
+    )
+    name = custom_name or info.get("Name", Path(desktop_file_path).stem)
+
+    overrides = {SOURCE_KEY: app_source_ref(desktop_file_path)}
+    if icon_path:
+        overrides["Icon"] = shortcut_icon(icon_path)
+    if custom_name:
+        overrides["Name"] = custom_name
+    if command:
+        overrides["Exec"] = command
+        overrides["TryExec"] = None
+    overrides.update(extra or {})
+    return name, rewrite_desktop_entry(data, overrides)
+
+
+# ─────────────────────────────────────────────
+#  Existing shortcuts
+# ─────────────────────────────────────────────
+
+# Written into every shortcut, so its origin is known without guessing
+TARGET_KEY = "X-DesktopLinker-Target"
+SOURCE_KEY = "X-DesktopLinker-Source"
+# Only in shortcuts written by "apply": what the manifest entry looked like
+DIGEST_KEY = "X-DesktopLinker-Digest"
+SHORTCUT_KEYS = (TARGET_KEY, SOURCE_KEY, DIGEST_KEY, "Exec", "Icon")
+_XDG_OPEN_RE = re.compile(r'xdg-open "((?:[^"\\]|\\.)*)"$')
+
+
+def shortcut_origin(info):
+    """Return ("file", target path) or ("app", desktop-file ID or entry
+    path, see app_source_ref()) for a parsed shortcut, or None for
+    launchers not made by Desktop Linker."""
+    if info.get(SOURCE_KEY):
+        return "app", info[SOURCE_KEY]
+    if info.get(TARGET_KEY):
+        return "file", info[TARGET_KEY]
+    # File shortcuts written before the key existed
+    m = _XDG_OPEN_RE.match(info.get("Exec", ""))
+    if m and os.path.isabs(m.group(1)):
+        return "file", unquote_exec_arg(m.group(1))
+    return None
+
+
+class ShortcutIndex:
+    """The shortcuts in the desktop directory, by what they point to.
+
+    scan() lists the directory with one scandir() and re-reads only files
+    whose mtime/inode/size changed; the parsed origins are persisted like
+    AppCatalogCache, so an unchanged desktop costs no reads at all.
+    update() applies a single-file change, e.g. from a directory monitor.
+    """
+    VERSION = 3
+    FILENAME = "shortcuts.json"
+
+    def __init__(self, directory=None, cache_path=None):
+        self.directory = str(directory or get_desktop_dir())
+        self.cache_path = Path(cache_path) if cache_path else get_cache_dir() / self.FILENAME
+        self.files = {}         # name -> [file_key, kind, value, digest, icon]
+        self.by_origin = {}     # (kind, value) -> [name, ...]
+        self.dirty = False
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
             return
-        name = self.app_name_entry.get_text().strip() or None
+        except (OSError, ValueError):
+            self.dirty = True
+            return
+        if (not isinstance(data, dict)
+                or data.get("version") != self.VERSION
+                or data.get("directory") != self.directory
+                or not isinstance(data.get("files"), dict)):
+            self.dirty = True
+            return
+        self.files = data["files"]
+
+    def scan(self):
+        """Bring the whole index up to date; returns self."""
+        if not self._loaded:
+            self._load()
+        files = {}
+        with profiler.span("shortcut_scan"):
+            try:
+                with os.scandir(self.directory) as it:
+                    for e in it:
+                        if e.name.startswith(".") or not e.name.endswith(".desktop"):
+                            continue
+                        try:
+                            if not e.is_file():
+                                continue
+                            st = e.stat()
+                        except OSError:
+                            continue
+                        files[e.name] = self._entry(e.path, st, self.files.get(e.name))
+            except OSError:
+                pass
+        if files.keys() != self.files.keys():
+            self.dirty = True
+        self.files = files
+        self.by_origin = {}
+        for name in sorted(files):
+            self._link(name)
+        self.save()
+        return self
+
+    def _entry(self, path, st, cached):
+        key = [st.st_mtime_ns, st.st_ino, st.st_size]
+        if isinstance(cached, list) and len(cached) == 5 and cached[0] == key:
+            return cached
+        profiler.count("shortcuts_read")
+        self.dirty = True
+        info = parse_desktop_file(path, SHORTCUT_KEYS)
+        kind, value = shortcut_origin(info) or (None, None)
+        return [key, kind, value, info.get(DIGEST_KEY), info.get("Icon")]
+
+    def _link(self, name):
+        _, kind, value = self.files[name][:3]
+        if kind:
+            self.by_origin.setdefault((kind, value), []).append(name)
+
+    def _unlink(self, name):
+        _, kind, value = self.files.pop(name)[:3]
+        names = self.by_origin.get((kind, value))
+        if names and name in names:
+            names.remove(name)
+            if not names:
+                del self.by_origin[(kind, value)]
+
+    def update(self, path):
+        """Re-check one file of the directory (created, changed or deleted)."""
+        name = os.path.basename(path)
+        if name.startswith(".") or not name.endswith(".desktop"):
+            return
+        path = os.path.join(self.directory, name)
+        cached = self.files.get(name)
+        if cached is not None:
+            self._unlink(name)
+        self.dirty = True
         try:
-            path = create_app_shortcut(
-                self.selected_app_info["_path"], self.selected_icon_path, name
-            )
-            self.show_toast(self.t("toast_created").format(os.path.basename(path)))
-        except Exception as e:
-            self.show_toast(self.t("toast_error").format(e))
+            st = os.stat(path)
+        except OSError:
+            return
+        if stat.S_ISREG(st.st_mode):
+            self.files[name] = self._entry(path, st, cached)
+            self._link(name)
+
+    def find(self, kind, value):
+        """Path of an existing shortcut with this origin, or None."""
+        names = self.by_origin.get((kind, value))
+        return os.path.join(self.directory, names[0]) if names else None
+
+    def find_target(self, target_path):
+        return self.find("file", os.path.abspath(target_path))
+
+    def find_app(self, desktop_id):
+        return self.find("app", desktop_id)
+
+    def digest(self, path):
+        """The manifest digest recorded in a shortcut, or None."""
+        entry = self.files.get(os.path.basename(path))
+        return entry[3] if entry else None
+
+    def find_managed(self, kind, value):
+        """Like find(), but only shortcuts written by apply (with a digest)."""
+        for name in self.by_origin.get((kind, value), ()):
+            if self.files[name][3]:
+                return os.path.join(self.directory, name)
+        return None
+
+    def stale(self):
+        """(path, kind, value) of shortcuts whose target no longer exists.
+
+        An app shortcut is stale when the entry it was made from is gone:
+        its recorded path, or every search dir's file for its ID. Entries
+        hidden from the app list still count, so this never parses apps.
+        """
+        result = []
+        for name in sorted(self.files):
+            _, kind, value = self.files[name][:3]
+            if kind == "file":
+                broken = not os.path.exists(value)
+            elif kind == "app":
+                if os.path.isabs(value):
+                    broken = not os.path.exists(value)
+                else:
+                    broken = _find_app_file(value) is None
+            else:
+                continue
+            if broken:
+                result.append((os.path.join(self.directory, name), kind, value))
+        return result
+
+    def icons_in_use(self):
+        """The Icon= values of all shortcuts in the directory."""
+        return {entry[4] for entry in self.files.values() if entry[4]}
+
+    def remove(self, paths):
+        """Delete shortcuts; returns one (path, error) tuple per path.
+
+        Stored icons no shortcut uses any more are deleted with them.
+        """
+        results = []
+        for path in paths:
+            try:
+                os.unlink(path)
+                results.append((path, None))
+            except FileNotFoundError:
+                results.append((path, None))
+            except OSError as e:
+                results.append((path, e))
+            self.update(path)
+        self.save()
+        # An unreadable directory must not make every stored icon look unused
+        if os.path.isdir(self.directory):
+            prune_icon_store(self.icons_in_use())
+        return results
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = {"version": self.VERSION, "directory": self.directory, "files": self.files}
+        if _save_json(self.cache_path, data):
+            self.dirty = False
 
-    def show_toast(self, message):
-        toast = Adw.Toast.new(message)
-        toast.set_timeout(3)
-        self.toast_overlay.add_toast(toast)
+
+# ─────────────────────────────────────────────
+#  Manifests
+# ─────────────────────────────────────────────
+
+MANIFEST_KEYS = ("target", "app", "name", "icon", "exec")
+
+
+class ManifestEntry:
+    """One shortcut a manifest asks for: a file target or an app ID."""
+    __slots__ = ("kind", "value", "name", "icon", "command")
+
+    def __init__(self, kind, value, name=None, icon=None, command=None):
+        self.kind = kind
+        self.value = value
+        self.name = name
+        self.icon = icon
+        self.command = command
+
+    def digest(self, source=None):
+        """Fingerprint of everything the shortcut is made from. Files it
+        is built from (the app's entry, an icon image) count by path,
+        mtime and size, so they are never read just to compare."""
+        parts = [self.kind, self.value, self.name, self.icon, self.command]
+        for path in (source, self.icon):
+            if path and os.path.isabs(path):
+                try:
+                    st = os.stat(path)
+                    parts.append([path, st.st_mtime_ns, st.st_size])
+                except OSError:
+                    parts.append([path])
+        import hashlib
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()[:16]
+
+    def __repr__(self):
+        return f"ManifestEntry({self.kind!r}, {self.value!r})"
+
+
+def load_manifest(path):
+    """Read a JSON or TOML (*.toml) manifest; returns (entries, prune).
+
+    {"prune": false,
+     "shortcuts": [{"target": "~/Projects", "name": "Projects"},
+                   {"app": "firefox", "icon": "web-browser"}]}
+
+    Relative target and icon paths are taken relative to the manifest.
+    Raises ValueError for anything malformed.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        raise ValueError(f"{path}: {e.strerror}")
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError(f"{path}: TOML manifests need Python 3.11 or newer")
+        try:
+            data = tomllib.loads(raw.decode("utf-8"))
+        except (tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+            raise ValueError(f"{path}: {e}")
+    else:
+        try:
+            data = json.loads(raw)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}")
+
+    if not isinstance(data, dict) or set(data) - {"prune", "shortcuts"}:
+        raise ValueError(f"{path}: expected only \"prune\" and \"shortcuts\" at the top level")
+    prune = data.get("prune", False)
+    shortcuts = data.get("shortcuts", [])
+    if not isinstance(prune, bool) or not isinstance(shortcuts, list):
+        raise ValueError(f"{path}: \"prune\" must be true/false and \"shortcuts\" a list")
+
+    entries = []
+    seen = set()
+    for i, item in enumerate(shortcuts, 1):
+        where = f"{path}: shortcut {i}"
+        if not isinstance(item, dict):
+            raise ValueError(f"{where}: expected an object")
+        unknown = set(item) - set(MANIFEST_KEYS)
+        if unknown:
+            raise ValueError(f"{where}: unknown key {sorted(unknown)[0]!r}")
+        if not all(isinstance(v, str) and v for v in item.values()):
+            raise ValueError(f"{where}: values must be non-empty strings")
+        if ("target" in item) == ("app" in item):
+            raise ValueError(f"{where}: needs either \"target\" or \"app\"")
+        if "exec" in item and "app" not in item:
+            raise ValueError(f"{where}: \"exec\" only applies to \"app\" shortcuts")
+
+        icon = item.get("icon")
+        if icon and "/" in icon:
+            icon = os.path.join(base, os.path.expanduser(icon))
+        if "target" in item:
+            kind = "file"
+            value = os.path.normpath(os.path.join(base, os.path.expanduser(item["target"])))
+        else:
+            kind = "app"
+            value = item["app"] if item["app"].endswith(".desktop") else item["app"] + ".desktop"
+        if (kind, value) in seen:
+            raise ValueError(f"{where}: {value} is listed twice")
+        seen.add((kind, value))
+        entries.append(ManifestEntry(kind, value, item.get("name"), icon, item.get("exec")))
+    return entries, prune
+
+
+def _manifest_shortcut(entry, source, digest):
+    extra = {DIGEST_KEY: digest}
+    if entry.kind == "file":
+        target = Path(entry.value)
+        name = entry.name or target.name
+        return name, _file_shortcut_content(target, name, entry.icon, extra)
+    return _app_shortcut_content(source, entry.icon, entry.name, entry.command, extra)
+
+
+def apply_manifest(entries, prune=False, dry_run=False, adopt=False):
+    """Make the desktop match a manifest; returns (action, path, error)
+    tuples, action being create, update, remove or exists.
+
+    The desktop is read once through ShortcutIndex, and a shortcut is only
+    written when the digest it records differs from its entry's, so
+    applying an unchanged manifest writes nothing. Only shortcuts an
+    earlier apply wrote are updated or pruned: one the user made for a
+    listed target is reported as "exists" and left alone, unless adopt
+    lets the manifest take it over. Writes are atomic and the directory
+    is synced once.
+    """
+    index = ShortcutIndex().scan()
+    allocator = None
+    results = []
+    wanted = set()
+    with profiler.span("apply_manifest"):
+        for entry in entries:
+            wanted.add((entry.kind, entry.value))
+            source = None
+            if entry.kind == "app":
+                source = _find_app_file(entry.value)
+                if source is None:
+                    results.append(("create", entry.value,
+                                    LookupError("app not found")))
+                    continue
+            elif not os.path.exists(entry.value):
+                # Still wanted: prune leaves its shortcut alone
+                results.append(("create", entry.value,
+                                LookupError("target not found")))
+                continue
+            digest = entry.digest(source)
+            path = index.find_managed(entry.kind, entry.value)
+            if path is None:
+                path = index.find(entry.kind, entry.value)
+                if path is not None and not adopt:
+                    results.append(("exists", path, None))
+                    continue
+            if path is not None and index.digest(path) == digest:
+                continue
+            action = "update" if path else "create"
+            if dry_run:
+                results.append((action, path or entry.value, None))
+                continue
+            try:
+                allocator = allocator or NameAllocator(index.directory)
+                name, content = _manifest_shortcut(entry, source, digest)
+                if path:
+                    tmp = _write_temp(allocator.directory, content)
+                    try:
+                        allocator.replace(tmp, path)
+                    except BaseException:
+                        _unlink_quietly(tmp)
+                        raise
+                    profiler.count("shortcuts_updated")
+                else:
+                    path = str(_publish_shortcut(allocator, name, content))
+                index.update(path)
+                results.append((action, path, None))
+            except Exception as e:
+                results.append((action, path or entry.value, e))
+        if allocator is not None:
+            allocator.sync()
+
+        if prune:
+            orphans = [os.path.join(index.directory, name)
+                       for name, (_, kind, value, digest, _) in sorted(index.files.items())
+                       if digest and (kind, value) not in wanted]
+            if dry_run:
+                results.extend(("remove", path, None) for path in orphans)
+            elif orphans:
+                results.extend(("remove", path, error) for path, error in index.remove(orphans))
+        index.save()
+    return results
+
+
+# ─────────────────────────────────────────────
+#  App search
+# ─────────────────────────────────────────────
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_search_text(text):
+    """Casefold, strip accents and collapse punctuation to single spaces."""
+    text = text.casefold()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def _exec_basename(exec_line):
+    for token in exec_line.split():
+        if token == "env" or "=" in token:
+            continue
+        return os.path.basename(token.strip("\"'"))
+    return ""
+
+
+class AppSearchIndex:
+    """Precomputed, ranked search over a list of apps.
+
+    Ranking: name prefix > name word start > word start in another field
+    (GenericName, Keywords, Exec, Categories, Comment) > name substring >
+    other substring > fuzzy (subsequence) name match. Ties keep name order.
+    A query that extends the previous one only re-checks previous matches.
+    """
+    TIERS = 6
+    MEMO_SIZE = 32
+
+    def __init__(self, apps=()):
+        self._entries = []
+        self._last_query = None
+        self._last_matches = None
+        self._memo = {}
+        self.add(apps)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _make_entry(app):
+        name = normalize_search_text(app.name)
+        fields = [
+            app.generic_name,
+            *app.keywords.split(";"),
+            _exec_basename(app.exec),
+            *app.categories.split(";"),
+            app.comment,
+        ]
+        # The name is repeated as the first hay field so one "in" check
+        # rejects most non-matches
+        hay = "\x00".join(
+            " " + f for f in [name, *map(normalize_search_text, fields)] if f
+        )
+        return (app_sort_key(app), name, " " + name, hay, app)
+
+    def add(self, apps):
+        self._entries.extend(self._make_entry(a) for a in apps)
+        self._entries.sort(key=lambda e: e[0])
+        self.clear_cache()
+
+    def clear_cache(self):
+        """Forget memoized results; they are recomputed on demand."""
+        self._last_query = None
+        self._last_matches = None
+        self._memo.clear()
+
+    def remove(self, apps):
+        ids = {id(a) for a in apps}
+        self._entries = [e for e in self._entries if id(e[4]) not in ids]
+        self.clear_cache()
+
+    def search(self, query):
+        """Return the matching apps, best match first."""
+        with profiler.span("search"):
+            return self._search(query)
+
+    def _search(self, query):
+        q = normalize_search_text(query)
+        if not q:
+            self._last_query = None
+            self._last_matches = None
+            return [e[4] for e in self._entries]
+
+        # Memoized so that deleting characters again is free
+        matches = self._memo.get(q)
+        if matches is not None:
+            self._last_query = q
+            self._last_matches = matches
+            return [e[4] for e in matches]
+
+        if self._last_query and q.startswith(self._last_query):
+            candidates = self._last_matches
+        else:
+            candidates = self._entries
+
+        word = " " + q
+        fuzzy = None
+        chars = q.replace(" ", "")
+        if len(chars) > 1:
+            # "[^b]*b" instead of ".*?b" keeps the match linear
+            fuzzy = re.compile(re.escape(chars[0]) + "".join(
+                f"[^{re.escape(c)}]*{re.escape(c)}" for c in chars[1:]
+            )).search
+        tiers = [[] for _ in range(self.TIERS)]
+        add0, add1, add2, add3, add4, add5 = (t.append for t in tiers)
+        for entry in candidates:
+            _, name, spaced, hay, _ = entry
+            if q in hay:
+                if name.startswith(q):
+                    add0(entry)
+                elif word in spaced:
+                    add1(entry)
+                elif word in hay:
+                    add2(entry)
+                elif q in name:
+                    add3(entry)
+                else:
+                    add4(entry)
+            elif fuzzy is not None and fuzzy(name):
+                add5(entry)
+
+        matches = [e for tier in tiers for e in tier]
+        self._last_query = q
+        self._last_matches = matches
+        if len(self._memo) >= self.MEMO_SIZE:
+            self._memo.pop(next(iter(self._memo)))
+        self._memo[q] = matches
+        return [e[4] for e in matches]
+
+
+# ─────────────────────────────────────────────
+#  Command line
+# ─────────────────────────────────────────────
+
+CLI_COMMANDS = ("create", "list-apps", "search", "stale", "apply")
+
+
+def find_app(ref, apps):
+    """Look up an app by .desktop path, desktop-file ID (with or without
+    .desktop) or display name."""
+    if os.sep in ref:
+        if not os.path.isfile(ref):
+            return None
+        return AppRecord(desktop_file_id(ref)[0], ref, parse_app_entry(ref))
+    desktop_id = ref if ref.endswith(".desktop") else ref + ".desktop"
+    for app in apps:
+        if app.id == desktop_id:
+            return app
+    for app in apps:
+        if app.name.casefold() == ref.casefold():
+            return app
+    return None
+
+
+def build_cli_parser():
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="desktop-linker",
+        description="Create desktop shortcuts on Linux. "
+                    "Without a command, the window is opened.",
+    )
+    # Handled by main() before dispatching; listed here for --help
+    parser.add_argument("--profile", nargs="?", const=True, metavar="FILE",
+                        help="print timings and counters on exit; with "
+                             "--profile=FILE also write a Chrome trace")
+    parser.add_argument("--background", action="store_true",
+                        help="without a command: start hidden and keep running "
+                             "after the window is closed, so it reopens instantly")
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    p = sub.add_parser("create", help="create shortcuts for files, folders or an app")
+    p.add_argument("targets", nargs="*", metavar="PATH", help="files or folders")
+    p.add_argument("--app", help="installed app (desktop-file ID, .desktop path or name)")
+    p.add_argument("--name", help="shortcut name (single shortcut only)")
+    p.add_argument("--icon", help="icon name or image path")
+    p.add_argument("--exec", dest="exec_line", metavar="COMMAND",
+                   help="command line replacing the app's Exec (with --app)")
+    p.add_argument("--duplicate", action="store_true",
+                   help="create a new shortcut even if one for the same "
+                        "target already exists (default: print the existing one)")
+
+    p = sub.add_parser("list-apps", help="list installed applications")
+    p.add_argument("--no-cache", action="store_true",
+                   help="discard the app catalog cache and rescan")
+
+    p = sub.add_parser("search", help="search installed applications")
+    p.add_argument("query")
+    p.add_argument("--limit", type=int, default=20, help="maximum results (default: 20)")
+
+    p = sub.add_parser("stale", help="list shortcuts whose file, folder or app is gone")
+    p.add_argument("--remove", action="store_true", help="delete them, and stored icons no shortcut uses any more")
+
+    p = sub.add_parser("apply", help="make the desktop match a JSON or TOML manifest")
+    p.add_argument("manifest", metavar="FILE")
+    p.add_argument("--prune", action="store_true",
+                   help="remove shortcuts an earlier apply created that the "
+                        "manifest no longer lists (or set \"prune\" in it)")
+    p.add_argument("--adopt", action="store_true",
+                   help="take over shortcuts made outside the manifest for "
+                        "targets it lists, instead of leaving them alone")
+    p.add_argument("--dry-run", action="store_true", help="only print what would change")
+
+    # Handled by main(); listed here for --help
+    sub.add_parser("serve", help="run the io.github.desktoplinker D-Bus service")
+    return parser
+
+
+def _print_apps(apps):
+    for app in apps:
+        print(f"{app.id}\t{app.name}\t{app.path}")
+
+
+def run_cli(argv):
+    parser = build_cli_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "list-apps":
+        if args.no_cache:
+            invalidate_app_cache()
+        _print_apps(find_installed_apps())
+        return 0
+
+    if args.command == "search":
+        results = AppSearchIndex(find_installed_apps()).search(args.query)
+        _print_apps(results[:args.limit] if args.limit > 0 else results)
+        return 0 if results else 1
+
+    if args.command == "create":
+        if bool(args.app) == bool(args.targets):
+            parser.error("create needs either PATH arguments or --app")
+        if args.name and len(args.targets) > 1:
+            parser.error("--name can only be used for a single shortcut")
+        if args.exec_line and not args.app:
+            parser.error("--exec can only be used with --app")
+        if (args.icon and not os.path.exists(args.icon)
+                and not get_icon_theme().has_icon(args.icon)):
+            print(f"desktop-linker: warning: icon not found in the "
+                  f"{get_icon_theme().name} icon theme: {args.icon}", file=sys.stderr)
+
+        # Shortcuts that already exist for a target are reused
+        index = None if args.duplicate or args.exec_line else ShortcutIndex().scan()
+        if args.app:
+            app = find_app(args.app, find_installed_apps())
+            if app is None:
+                parser.error(f"app not found: {args.app}")
+            existing = index and index.find_app(app_source_ref(app.path))
+            if existing:
+                results = [(args.app, existing, None)]
+            else:
+                try:
+                    path = create_app_shortcut(app.path, args.icon, args.name,
+                                               command=args.exec_line)
+                    results = [(args.app, path, None)]
+                except Exception as e:
+                    results = [(args.app, None, e)]
+        else:
+            targets = [os.path.abspath(t) for t in args.targets]
+            existing = {t: index.find_target(t) for t in targets} if index else {}
+            todo = [t for t in targets if not existing.get(t)]
+            created = {}
+            if len(todo) == 1:
+                try:
+                    created[todo[0]] = (create_file_shortcut(todo[0], args.icon, args.name), None)
+                except Exception as e:
+                    created[todo[0]] = (None, e)
+            elif todo:
+                for target, path, error in create_file_shortcuts(todo, args.icon):
+                    created[target] = (path, error)
+            results = [(t, existing[t], None) if existing.get(t) else (t, *created[t])
+                       for t in targets]
+
+        failed = 0
+        for target, path, error in results:
+            if error is None:
+                print(path)
+            else:
+                failed += 1
+                print(f"desktop-linker: {target}: {error}", file=sys.stderr)
+        return 1 if failed else 0
+
+    if args.command == "apply":
+        try:
+            entries, prune = load_manifest(args.manifest)
+        except ValueError as e:
+            print(f"desktop-linker: {e}", file=sys.stderr)
+            return 2
+        failed = 0
+        for action, path, error in apply_manifest(entries, prune or args.prune,
+                                                  args.dry_run, args.adopt):
+            if error is None:
+                print(f"{action}\t{path}")
+            else:
+                failed += 1
+                print(f"desktop-linker: {path}: {error}", file=sys.stderr)
+        return 1 if failed else 0
+
+    if args.command == "stale":
+        index = ShortcutIndex().scan()
+        stale = index.stale()
+        if args.remove:
+            failed = 0
+            for path, error in index.remove([path for path, _, _ in stale]):
+                if error is not None:
+                    failed += 1
+                    print(f"desktop-linker: {path}: {error}", file=sys.stderr)
+                else:
+                    print(path)
+            return 1 if failed else 0
+        for path, _, value in stale:
+            print(f"{path}\t{value}")
+        return 0
+
+    parser.print_help()
+    return 0
+
+
+def _take_profile_option(argv):
+    """Remove a leading --profile[=FILE] and enable the profiler for it."""
+    rest = list(argv)
+    while rest and (rest[0] == "--profile" or rest[0].startswith("--profile=")):
+        opt = rest.pop(0)
+        profiler.enable(opt.partition("=")[2] or None)
+    return rest
+
+
+def main(argv=None):
+    argv = _take_profile_option(sys.argv[1:] if argv is None else argv)
+    try:
+        if argv and argv[0] in CLI_COMMANDS + ("-h", "--help"):
+            with profiler.span(f"cli:{argv[0]}"):
+                return run_cli(argv)
+        if argv and argv[0] == "serve":
+            from desktop_linker_service import run_service
+            return run_service(argv[1:])
+        # GTK is only imported when the window is actually requested
+        with profiler.span("import_gui"):
+            from desktop_linker_gui import DesktopLinkerApp
+        return DesktopLinkerApp().run([sys.argv[0]] + argv)
+    finally:
+        profiler.finish()
 
 
 if __name__ == "__main__":
-    app = DesktopLinkerApp()
-    app.run()
+    # Make "import desktop_linker" from the GUI module reuse this module
+    sys.modules.setdefault("desktop_linker", sys.modules[__name__])
+    sys.exit(main())
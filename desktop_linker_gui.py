@@ -0,0 +1,1004 @@
+#!/usr/bin/env python3
+"""
+Desktop Linker - GTK user interface
+Imported by desktop_linker.main() only when the window is requested.
+"""
+
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import Gtk, Adw, Gio, GLib, Gdk, GdkPixbuf, GObject, Pango
+
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from desktop_linker import (
+    APP_VERSION, APP_DEVELOPER, I18n, available_languages, profiler, get_icon_theme,
+    create_file_shortcut, create_file_shortcuts, create_app_shortcut,
+)
+from desktop_linker_service import (
+    LiveCatalog, LiveShortcuts, ShortcutJobs, ShortcutService, take_over_service,
+)
+
+
+# ─────────────────────────────────────────────
+#  GUI
+# ─────────────────────────────────────────────
+
+class IconLoader:
+    """Decodes icon files off the main thread into a bounded LRU texture cache.
+
+    Images are scaled to the requested pixel size while decoding, so large
+    PNG/SVG icons never get decoded at full resolution. Callbacks always run
+    on the GTK main loop.
+    """
+    def __init__(self, max_bytes=16 * 1024 * 1024, workers=2):
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()     # (path, size) -> (texture, nbytes)
+        self._bytes = 0
+        self._failed = set()
+        self._pending = {}              # (path, size) -> [future, callbacks]
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def request(self, path, size, callback):
+        """Call callback(texture) now if cached, otherwise once decoded.
+
+        The texture is None if the file could not be loaded.
+        """
+        key = (path, size)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            profiler.count("icon_cache_hits")
+            callback(cached[0])
+            return
+        if key in self._failed:
+            callback(None)
+            return
+        pending = self._pending.get(key)
+        if pending is None:
+            future = self._executor.submit(self._decode, key)
+            pending = self._pending[key] = [future, []]
+        pending[1].append(callback)
+
+    def cancel(self, path, size, callback):
+        """Drop a callback; the decode is skipped if nobody else waits for it."""
+        key = (path, size)
+        pending = self._pending.get(key)
+        if pending is None or callback not in pending[1]:
+            return
+        pending[1].remove(callback)
+        if not pending[1] and pending[0].cancel():
+            del self._pending[key]
+
+    def clear(self):
+        self._cache.clear()
+        self._failed.clear()
+        self._bytes = 0
+
+    def shutdown(self):
+        for future, _ in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+    def _decode(self, key):
+        """Runs in a worker thread."""
+        path, size = key
+        try:
+            with profiler.span("icon_decode"):
+                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(path, size, size, True)
+            profiler.count("icons_decoded")
+        except GLib.Error:
+            pixbuf = None
+        GLib.idle_add(self._finish, key, pixbuf)
+
+    def _finish(self, key, pixbuf):
+        pending = self._pending.pop(key, None)
+        texture = None
+        if pixbuf is not None:
+            texture = Gdk.Texture.new_for_pixbuf(pixbuf)
+            self._store(key, texture, pixbuf.get_width() * pixbuf.get_height() * 4)
+        else:
+            self._failed.add(key)
+        if pending:
+            for callback in pending[1]:
+                callback(texture)
+        return GLib.SOURCE_REMOVE
+
+    def _store(self, key, texture, nbytes):
+        self._cache[key] = (texture, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes and len(self._cache) > 1:
+            _, (_, evicted) = self._cache.popitem(last=False)
+            self._bytes -= evicted
+
+
+class DesktopLinkerApp(Adw.Application):
+    """Single-instance application owning one window.
+
+    Activating the running instance again (e.g. from the menu) re-presents
+    that window with its catalog and icon caches still warm. The catalog
+    also backs the D-Bus interface of desktop_linker_service. With
+    --background the instance starts with a hidden window and keeps
+    running when it is closed; caches are released after RELEASE_AFTER_S
+    seconds hidden.
+    """
+    RELEASE_AFTER_S = 600
+
+    def __init__(self):
+        # Before registering: a headless service holding the ID cannot
+        # show the window this instance would forward its activation to
+        take_over_service()
+        super().__init__(application_id="io.github.desktoplinker")
+        self.i18n = I18n()
+        self.catalog = LiveCatalog()
+        self.shortcuts = LiveShortcuts()
+        self.service = ShortcutService(self.catalog)
+        self.win = None
+        self.background = False
+        self._start_hidden = False
+        self._release_source = 0
+        self.add_main_option(
+            "background", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+            "Keep running in the background so the window opens instantly", None,
+        )
+        self.connect("handle-local-options", self.on_handle_local_options)
+        self.connect("startup", self.on_startup)
+        self.connect("shutdown", self.on_shutdown)
+        self.connect("activate", self.on_activate)
+
+    def on_startup(self, app):
+        self.catalog.start()
+        self.shortcuts.start()
+        connection = self.get_dbus_connection()
+        if connection is not None:
+            self.service.export(connection)
+
+        # The only way to end a --background instance besides logging out
+        quit_action = Gio.SimpleAction.new("quit", None)
+        quit_action.connect("activate", lambda action, param: self.quit())
+        self.add_action(quit_action)
+        self.set_accels_for_action("app.quit", ["<Control>q"])
+
+    def on_shutdown(self, app):
+        self.service.unexport()
+        self.catalog.stop()
+        self.shortcuts.stop()
+
+    def on_handle_local_options(self, app, options):
+        if options.contains("background"):
+            self.background = True
+            self._start_hidden = True
+        return -1
+
+    def on_activate(self, app):
+        if self.win is None:
+            if self.background:
+                self.hold()
+            with profiler.span("window_init"):
+                self.win = MainWindow(application=app, i18n=self.i18n,
+                                      catalog=self.catalog, shortcuts=self.shortcuts)
+            if profiler.enabled:
+                self.win.connect("map", lambda w: profiler.mark("window_mapped"))
+            if self._start_hidden:
+                self._start_hidden = False
+                self.window_hidden()
+                return
+        self._cancel_release()
+        self.win.present()
+
+    def window_hidden(self):
+        """Called when the window goes to the background."""
+        self._cancel_release()
+        self._release_source = GLib.timeout_add_seconds(
+            self.RELEASE_AFTER_S, self._on_release_timeout
+        )
+
+    def _cancel_release(self):
+        if self._release_source:
+            GLib.source_remove(self._release_source)
+            self._release_source = 0
+
+    def _on_release_timeout(self):
+        self._release_source = 0
+        self.win.release_caches()
+        return GLib.SOURCE_REMOVE
+
+
+class MainWindow(Adw.ApplicationWindow):
+    def __init__(self, i18n, catalog, shortcuts, **kwargs):
+        super().__init__(**kwargs)
+        self.i18n = i18n
+        self.selected_icon_path = None
+        self.file_target_paths = []
+        self.selected_app_info = None
+        self._app_search_text = ""
+        self.catalog = catalog
+        self.shortcuts = shortcuts
+        self.icon_loader = IconLoader()
+        self.jobs = ShortcutJobs(self._on_jobs_progress)
+        self._progress_source = 0
+        self._pulse_source = 0
+        settings = Gtk.Settings.get_default()
+        self.icon_theme = get_icon_theme(settings.get_property("gtk-icon-theme-name"))
+        settings.connect("notify::gtk-icon-theme-name", self._on_icon_theme_changed)
+
+        self.set_default_size(700, 680)
+        with profiler.span("build_ui"):
+            self._build_ui()
+        self.connect("close-request", self.on_close_request)
+        catalog.connect_changed(self._on_catalog_changed)
+        catalog.connect_loaded(self._on_catalog_loaded)
+        self._refresh_app_results()
+
+    def t(self, key):
+        return self.i18n.t(key)
+
+    def _build_ui(self):
+        self.set_title(self.t("app_title"))
+
+        main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+
+        # ── Header ──
+        header = Adw.HeaderBar()
+        header.add_css_class("flat")
+
+        # Language toggle button
+        self.lang_btn = Gtk.Button()
+        self._update_lang_button()
+        self.lang_btn.connect("clicked", self.on_toggle_language)
+        header.pack_end(self.lang_btn)
+
+        # About button
+        about_btn = Gtk.Button()
+        about_btn.set_icon_name("help-about-symbolic")
+        about_btn.set_tooltip_text("About")
+        about_btn.connect("clicked", self.on_about)
+        header.pack_end(about_btn)
+
+        # Stale shortcut cleanup
+        self.clean_btn = Gtk.Button()
+        self.clean_btn.set_icon_name("edit-clear-all-symbolic")
+        self.clean_btn.set_tooltip_text(self.t("btn_clean_stale"))
+        self.clean_btn.connect("clicked", self.on_clean_stale)
+        header.pack_start(self.clean_btn)
+
+        main_box.append(header)
+
+        # ── View Stack ──
+        self.stack = Adw.ViewStack()
+
+        top_switcher = Adw.ViewSwitcher()
+        top_switcher.set_stack(self.stack)
+        top_switcher.set_policy(Adw.ViewSwitcherPolicy.WIDE)
+        header.set_title_widget(top_switcher)
+
+        tab_bar = Adw.ViewSwitcherBar()
+        tab_bar.set_stack(self.stack)
+        tab_bar.set_reveal(True)
+
+        # Build tabs
+        self.file_page_content = self._build_file_tab()
+        self.app_page_content = self._build_app_tab()
+
+        self.file_stack_page = self.stack.add_titled_with_icon(
+            self.file_page_content, "files",
+            self.t("tab_files"), "folder-symbolic"
+        )
+        self.app_stack_page = self.stack.add_titled_with_icon(
+            self.app_page_content, "apps",
+            self.t("tab_apps"), "application-x-executable-symbolic"
+        )
+
+        main_box.append(self.stack)
+
+        # ── Progress while shortcuts are being created ──
+        self.progress_revealer = Gtk.Revealer()
+        progress_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        progress_box.set_margin_top(8)
+        progress_box.set_margin_bottom(8)
+        progress_box.set_margin_start(16)
+        progress_box.set_margin_end(16)
+        self.progress_bar = Gtk.ProgressBar()
+        self.progress_bar.set_show_text(True)
+        self.progress_bar.set_hexpand(True)
+        self.progress_bar.set_valign(Gtk.Align.CENTER)
+        self.progress_cancel = Gtk.Button(label=self.t("btn_cancel"))
+        self.progress_cancel.connect("clicked", lambda *_: self.jobs.cancel())
+        progress_box.append(self.progress_bar)
+        progress_box.append(self.progress_cancel)
+        self.progress_revealer.set_child(progress_box)
+        main_box.append(self.progress_revealer)
+
+        main_box.append(tab_bar)
+
+        # ── Toast overlay ──
+        self.toast_overlay = Adw.ToastOverlay()
+        self.set_content(self.toast_overlay)
+        self.toast_overlay.set_child(main_box)
+
+    # ────────────────────────────────────────────
+    #  TAB 1 – File / Folder
+    # ────────────────────────────────────────────
+    def _build_file_tab(self):
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=16)
+        box.set_margin_top(16)
+        box.set_margin_bottom(16)
+        box.set_margin_start(16)
+        box.set_margin_end(16)
+
+        # Drop area
+        self.drop_label = Gtk.Label(label=self.t("drop_hint"))
+        self.drop_label.set_justify(Gtk.Justification.CENTER)
+        self.drop_label.add_css_class("dim-label")
+
+        self.drop_area = Gtk.Frame()
+        self.drop_area.set_size_request(-1, 120)
+
+        drop_inner = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        drop_inner.set_valign(Gtk.Align.CENTER)
+        drop_inner.set_halign(Gtk.Align.CENTER)
+
+        drop_icon = Gtk.Image.new_from_icon_name("document-send-symbolic")
+        drop_icon.set_pixel_size(48)
+        drop_icon.add_css_class("dim-label")
+        drop_inner.append(drop_icon)
+        drop_inner.append(self.drop_label)
+        self.drop_area.set_child(drop_inner)
+
+        drop_target = Gtk.DropTarget.new(GObject.TYPE_NONE, Gdk.DragAction.COPY)
+        drop_target.set_gtypes([Gdk.FileList, Gio.File])
+        drop_target.connect("drop", self.on_file_drop)
+        drop_target.connect("enter", lambda *_: Gdk.DragAction.COPY)
+        self.drop_area.add_controller(drop_target)
+        box.append(self.drop_area)
+
+        # Path row
+        self.file_path_row = Adw.ActionRow()
+        self.file_path_row.set_title(self.t("no_path"))
+        self.file_path_row.set_subtitle(self.t("select_file_folder"))
+        self.file_path_row.add_css_class("property")
+
+        self.btn_choose_file = Gtk.Button(label=self.t("btn_choose_file"))
+        self.btn_choose_file.set_valign(Gtk.Align.CENTER)
+        self.btn_choose_file.connect("clicked", self.on_choose_file)
+
+        self.btn_choose_folder = Gtk.Button(label=self.t("btn_choose_folder"))
+        self.btn_choose_folder.set_valign(Gtk.Align.CENTER)
+        self.btn_choose_folder.connect("clicked", self.on_choose_folder)
+
+        self.file_path_row.add_suffix(self.btn_choose_file)
+        self.file_path_row.add_suffix(self.btn_choose_folder)
+
+        # Name entry
+        self.file_name_entry = Adw.EntryRow()
+        self.file_name_entry.set_title(self.t("shortcut_name"))
+
+        # Icon row
+        self.file_icon_row = self._build_icon_row("file")
+
+        self.file_group = Adw.PreferencesGroup()
+        self.file_group.set_title(self.t("configure_shortcut"))
+        self.file_group.add(self.file_path_row)
+        self.file_group.add(self.file_name_entry)
+        self.file_group.add(self.file_icon_row)
+        box.append(self.file_group)
+
+        self.btn_create_file = Gtk.Button(label=self.t("btn_create_file"))
+        self.btn_create_file.add_css_class("suggested-action")
+        self.btn_create_file.add_css_class("pill")
+        self.btn_create_file.set_halign(Gtk.Align.CENTER)
+        self.btn_create_file.connect("clicked", self.on_create_file_shortcut)
+        box.append(self.btn_create_file)
+
+        return box
+
+    # ────────────────────────────────────────────
+    #  TAB 2 – Apps
+    # ────────────────────────────────────────────
+    def _build_app_tab(self):
+        outer_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        outer_box.set_margin_top(16)
+        outer_box.set_margin_bottom(16)
+        outer_box.set_margin_start(16)
+        outer_box.set_margin_end(16)
+
+        self.app_search = Gtk.SearchEntry()
+        self.app_search.set_placeholder_text(self.t("search_placeholder"))
+        self.app_search.set_search_delay(self.SEARCH_DELAY_MS)
+        self.app_search.connect("search-changed", self.on_app_search_changed)
+        outer_box.append(self.app_search)
+
+        # Loading state, visible until discovery has finished
+        self.app_loading_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        self.app_loading_box.set_halign(Gtk.Align.CENTER)
+        self.app_loading_spinner = Gtk.Spinner()
+        self.app_loading_spinner.start()
+        self.app_loading_label = Gtk.Label(label=self.t("loading_apps"))
+        self.app_loading_label.add_css_class("dim-label")
+        self.app_loading_box.append(self.app_loading_spinner)
+        self.app_loading_box.append(self.app_loading_label)
+        outer_box.append(self.app_loading_box)
+
+        paned = Gtk.Paned(orientation=Gtk.Orientation.VERTICAL)
+        paned.set_vexpand(True)
+        paned.set_wide_handle(True)
+        outer_box.append(paned)
+
+        scroll = Gtk.ScrolledWindow()
+        scroll.set_vexpand(True)
+        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scroll.set_min_content_height(180)
+
+        # Ranked search results are spliced into this list as desktop-file
+        # IDs in one call; rows look the app up when bound and are recycled
+        self.app_results = Gtk.StringList()
+        self.app_selection = Gtk.SingleSelection.new(self.app_results)
+        self.app_selection.set_autoselect(False)
+        self.app_selection.set_can_unselect(True)
+        self.app_selection.connect("notify::selected-item", self.on_app_selected)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_app_row_setup)
+        factory.connect("bind", self._on_app_row_bind)
+        factory.connect("unbind", self._on_app_row_unbind)
+
+        self.app_list_view = Gtk.ListView.new(self.app_selection, factory)
+        self.app_list_view.add_css_class("navigation-sidebar")
+        scroll.set_child(self.app_list_view)
+        paned.set_start_child(scroll)
+        paned.set_shrink_start_child(False)
+
+        bottom_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        bottom_box.set_margin_top(8)
+
+        self.app_name_entry = Adw.EntryRow()
+        self.app_name_entry.set_title(self.t("shortcut_name") + " (optional)")
+
+        self.app_icon_row = self._build_icon_row("app")
+
+        self.app_config_group = Adw.PreferencesGroup()
+        self.app_config_group.set_title(self.t("configure_shortcut"))
+        self.app_config_group.add(self.app_name_entry)
+        self.app_config_group.add(self.app_icon_row)
+        bottom_box.append(self.app_config_group)
+
+        self.btn_create_app = Gtk.Button(label=self.t("btn_create_app"))
+        self.btn_create_app.add_css_class("suggested-action")
+        self.btn_create_app.add_css_class("pill")
+        self.btn_create_app.set_halign(Gtk.Align.CENTER)
+        self.btn_create_app.connect("clicked", self.on_create_app_shortcut)
+        bottom_box.append(self.btn_create_app)
+
+        paned.set_end_child(bottom_box)
+        paned.set_shrink_end_child(False)
+        paned.set_position(320)
+
+        return outer_box
+
+    # ────────────────────────────────────────────
+    #  App catalog
+    # ────────────────────────────────────────────
+    SEARCH_DELAY_MS = 100
+
+    def _on_catalog_changed(self, added, removed):
+        if self.selected_app_info in removed:
+            self.selected_app_info = None
+        if added:
+            # New apps often come with new icons
+            self.icon_theme.refresh()
+        with profiler.span("update_app_list"):
+            self._refresh_app_results()
+
+    def _on_catalog_loaded(self):
+        self.app_loading_spinner.stop()
+        self.app_loading_box.set_visible(False)
+
+    def on_close_request(self, win):
+        app = self.get_application()
+        if app is not None and app.background:
+            # Stay warm: keep the catalog, its monitors and the icon cache
+            self.set_visible(False)
+            app.window_hidden()
+            return True
+        self.icon_loader.shutdown()
+        self.jobs.shutdown()
+        return False
+
+    def _on_icon_theme_changed(self, settings, pspec):
+        self.icon_theme = get_icon_theme(settings.get_property("gtk-icon-theme-name"))
+        n = self.app_results.get_n_items()
+        self.app_results.items_changed(0, n, n)
+
+    def release_caches(self):
+        """Drop what can be rebuilt cheaply while the window is hidden."""
+        self.icon_loader.clear()
+        self.catalog.index.clear_cache()
+
+    def _refresh_app_results(self):
+        selected = self.selected_app_info
+        ids = [a.id for a in self.catalog.search(self._app_search_text)]
+        self.app_results.splice(0, self.app_results.get_n_items(), ids)
+        if selected is not None and selected.id in ids:
+            self.app_selection.set_selected(ids.index(selected.id))
+
+    def _on_app_row_setup(self, factory, list_item):
+        row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        row.set_margin_top(6)
+        row.set_margin_bottom(6)
+
+        img = Gtk.Image()
+        img.set_pixel_size(32)
+        row.append(img)
+
+        labels = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        labels.set_valign(Gtk.Align.CENTER)
+        title = Gtk.Label(xalign=0)
+        title.set_ellipsize(Pango.EllipsizeMode.END)
+        subtitle = Gtk.Label(xalign=0)
+        subtitle.set_ellipsize(Pango.EllipsizeMode.END)
+        subtitle.add_css_class("dim-label")
+        subtitle.add_css_class("caption")
+        labels.append(title)
+        labels.append(subtitle)
+        row.append(labels)
+
+        row._icon = img
+        row._title = title
+        row._subtitle = subtitle
+        row._icon_request = None
+        list_item.set_child(row)
+        profiler.count("rows_built")
+
+    def _on_app_row_bind(self, factory, list_item):
+        row = list_item.get_child()
+        app = self.catalog.get(list_item.get_item().get_string())
+        profiler.count("rows_bound")
+        row._title.set_label(app.name or self.t("unknown_app"))
+        comment = app.comment or app.generic_name
+        row._subtitle.set_label(comment)
+        row._subtitle.set_visible(bool(comment))
+
+        icon_name = app.icon or "application-x-executable"
+        pixel_size, scale = row._icon.get_pixel_size(), row.get_scale_factor()
+        if not os.path.isabs(icon_name):
+            # Resolved without GTK and memoized: names missing from the
+            # theme get the fallback instead of the "missing" image, and
+            # icons found only as files (e.g. in /usr/share/pixmaps) are
+            # loaded from there
+            path, themed = self.icon_theme.resolve(icon_name, pixel_size, scale)
+            if themed:
+                row._icon.set_from_icon_name(icon_name)
+                return
+            if path is None:
+                row._icon.set_from_icon_name("application-x-executable")
+                return
+            icon_name = path
+
+        # File icons are decoded in the background, only for bound rows
+        row._icon.set_from_icon_name("application-x-executable")
+        size = pixel_size * scale
+
+        def on_icon_loaded(texture):
+            if row._icon_request is request and texture is not None:
+                row._icon.set_from_paintable(texture)
+
+        request = row._icon_request = (icon_name, size, on_icon_loaded)
+        self.icon_loader.request(*request)
+
+    def _on_app_row_unbind(self, factory, list_item):
+        row = list_item.get_child()
+        if row._icon_request is not None:
+            self.icon_loader.cancel(*row._icon_request)
+            row._icon_request = None
+
+    def _build_icon_row(self, prefix):
+        row = Adw.ActionRow()
+        row.set_title(self.t("custom_icon"))
+        row.set_subtitle(self.t("no_icon"))
+
+        preview = Gtk.Image()
+        preview.set_pixel_size(32)
+        row.add_prefix(preview)
+
+        btn_icon = Gtk.Button(label=self.t("btn_choose_icon"))
+        btn_icon.set_valign(Gtk.Align.CENTER)
+        btn_icon.connect("clicked", lambda *_: self.on_choose_icon(row, preview))
+
+        btn_clear = Gtk.Button()
+        btn_clear.set_icon_name("edit-clear-symbolic")
+        btn_clear.set_valign(Gtk.Align.CENTER)
+        btn_clear.set_tooltip_text(self.t("btn_clear_icon"))
+        btn_clear.connect("clicked", lambda *_: self.on_clear_icon(row, preview))
+
+        row.add_suffix(btn_icon)
+        row.add_suffix(btn_clear)
+
+        # Store references for language updates
+        row._btn_icon = btn_icon
+        row._btn_clear = btn_clear
+        row._preview = preview
+
+        return row
+
+    # ────────────────────────────────────────────
+    #  Language switching
+    # ────────────────────────────────────────────
+    def on_toggle_language(self, btn):
+        self.i18n.switch()
+        self._update_all_labels()
+        self._update_lang_button()
+
+    def _update_lang_button(self):
+        # Show flag of the NEXT language (the one you'd switch TO)
+        lang = self.i18n.next_language()
+        info = available_languages().get(lang, {})
+        self.lang_btn.set_label(info.get("flag") or lang.upper())
+        self.lang_btn.set_tooltip_text(
+            self.t("lang_button_tooltip").format(info.get("name", lang))
+        )
+
+    def _update_all_labels(self):
+        """Update all UI strings after language switch."""
+        self.set_title(self.t("app_title"))
+        self.clean_btn.set_tooltip_text(self.t("btn_clean_stale"))
+        self.progress_cancel.set_label(self.t("btn_cancel"))
+
+        # Tab titles
+        self.file_stack_page.set_title(self.t("tab_files"))
+        self.app_stack_page.set_title(self.t("tab_apps"))
+
+        # File tab
+        self.drop_label.set_label(self.t("drop_hint"))
+        if not self.file_target_paths:
+            self.file_path_row.set_title(self.t("no_path"))
+            self.file_path_row.set_subtitle(self.t("select_file_folder"))
+        elif len(self.file_target_paths) > 1:
+            self._set_file_paths(self.file_target_paths)
+        self.btn_choose_file.set_label(self.t("btn_choose_file"))
+        self.btn_choose_folder.set_label(self.t("btn_choose_folder"))
+        self.file_name_entry.set_title(self.t("shortcut_name"))
+        self.file_group.set_title(self.t("configure_shortcut"))
+        self.btn_create_file.set_label(self.t("btn_create_file"))
+
+        # File icon row
+        self.file_icon_row.set_title(self.t("custom_icon"))
+        if not self.file_icon_row._preview.get_paintable():
+            self.file_icon_row.set_subtitle(self.t("no_icon"))
+        self.file_icon_row._btn_icon.set_label(self.t("btn_choose_icon"))
+        self.file_icon_row._btn_clear.set_tooltip_text(self.t("btn_clear_icon"))
+
+        # App tab
+        self.app_search.set_placeholder_text(self.t("search_placeholder"))
+        self.app_loading_label.set_label(self.t("loading_apps"))
+        self.app_name_entry.set_title(self.t("shortcut_name") + " (optional)")
+        self.app_config_group.set_title(self.t("configure_shortcut"))
+        self.btn_create_app.set_label(self.t("btn_create_app"))
+
+        # App icon row
+        self.app_icon_row.set_title(self.t("custom_icon"))
+        if not self.app_icon_row._preview.get_paintable():
+            self.app_icon_row.set_subtitle(self.t("no_icon"))
+        self.app_icon_row._btn_icon.set_label(self.t("btn_choose_icon"))
+        self.app_icon_row._btn_clear.set_tooltip_text(self.t("btn_clear_icon"))
+
+    # ────────────────────────────────────────────
+    #  About dialog
+    # ────────────────────────────────────────────
+    def on_about(self, btn):
+        about = Adw.AboutWindow(transient_for=self)
+        about.set_application_name("Desktop Linker")
+        about.set_version(APP_VERSION)
+        about.set_developer_name(APP_DEVELOPER)
+        about.set_comments(self.t("about_app"))
+        about.set_license_type(Gtk.License.MIT_X11)
+        about.set_application_icon("insert-link")
+        about.present()
+
+    # ────────────────────────────────────────────
+    #  Signal handlers
+    # ────────────────────────────────────────────
+    def on_file_drop(self, drop_target, value, x, y):
+        if isinstance(value, Gdk.FileList):
+            files = value.get_files()
+        elif isinstance(value, Gio.File):
+            files = [value]
+        else:
+            return False
+        paths = [f.get_path() for f in files if f.get_path()]
+        if paths:
+            self._set_file_paths(paths)
+            return True
+        return False
+
+    def _set_file_paths(self, paths):
+        self.file_target_paths = list(paths)
+        if len(paths) == 1:
+            path = paths[0]
+            self.file_path_row.set_title(os.path.basename(path))
+            self.file_path_row.set_subtitle(path)
+            self.file_name_entry.set_sensitive(True)
+            if not self.file_name_entry.get_text():
+                self.file_name_entry.set_text(os.path.basename(path))
+        else:
+            # Each shortcut is named after its target in batch mode
+            self.file_path_row.set_title(self.t("items_selected").format(len(paths)))
+            self.file_path_row.set_subtitle(", ".join(os.path.basename(p) for p in paths))
+            self.file_name_entry.set_text("")
+            self.file_name_entry.set_sensitive(False)
+
+    def on_choose_file(self, btn):
+        dialog = Gtk.FileDialog()
+        dialog.set_title(self.t("dialog_file_title"))
+        dialog.open_multiple(self, None, self._on_file_chosen)
+
+    def _on_file_chosen(self, dialog, result):
+        try:
+            self._set_chosen_files(dialog.open_multiple_finish(result))
+        except GLib.Error:
+            pass
+
+    def on_choose_folder(self, btn):
+        dialog = Gtk.FileDialog()
+        dialog.set_title(self.t("dialog_folder_title"))
+        dialog.select_multiple_folders(self, None, self._on_folder_chosen)
+
+    def _on_folder_chosen(self, dialog, result):
+        try:
+            self._set_chosen_files(dialog.select_multiple_folders_finish(result))
+        except GLib.Error:
+            pass
+
+    def _set_chosen_files(self, files):
+        if files:
+            paths = [f.get_path() for f in files if f.get_path()]
+            if paths:
+                self._set_file_paths(paths)
+
+    def on_choose_icon(self, row, preview):
+        dialog = Gtk.FileDialog()
+        dialog.set_title(self.t("dialog_icon_title"))
+        filter_img = Gtk.FileFilter()
+        filter_img.set_name(self.t("filter_images"))
+        filter_img.add_mime_type("image/png")
+        filter_img.add_mime_type("image/svg+xml")
+        filter_img.add_mime_type("image/x-xpixmap")
+        filters = Gio.ListStore.new(Gtk.FileFilter)
+        filters.append(filter_img)
+        dialog.set_filters(filters)
+        dialog.open(self, None, lambda d, r: self._on_icon_chosen(d, r, row, preview))
+
+    def _on_icon_chosen(self, dialog, result, row, preview):
+        try:
+            f = dialog.open_finish(result)
+            if f:
+                path = f.get_path()
+                self.selected_icon_path = path
+                row.set_subtitle(os.path.basename(path))
+                # Decoded at preview size off the main thread, not in full
+                size = preview.get_pixel_size() * preview.get_scale_factor()
+                self.icon_loader.request(
+                    path, size, lambda texture: self._on_icon_preview(preview, path, texture)
+                )
+        except GLib.Error:
+            pass
+
+    def _on_icon_preview(self, preview, path, texture):
+        if texture is not None and self.selected_icon_path == path:
+            preview.set_from_paintable(texture)
+
+    def on_clear_icon(self, row, preview):
+        self.selected_icon_path = None
+        row.set_subtitle(self.t("no_icon"))
+        preview.clear()
+
+    def on_app_search_changed(self, entry):
+        text = entry.get_text()
+        if text == self._app_search_text:
+            return
+        self._app_search_text = text
+        self._refresh_app_results()
+
+    def on_app_selected(self, selection, pspec):
+        item = selection.get_selected_item()
+        if item is not None:
+            self.selected_app_info = self.catalog.get(item.get_string())
+
+    def on_create_file_shortcut(self, btn):
+        if not self.file_target_paths:
+            self.show_toast(self.t("toast_no_file"))
+            return
+        if len(self.file_target_paths) > 1:
+            self._create_file_shortcuts(self.file_target_paths)
+            return
+        target = self.file_target_paths[0]
+        name = self.file_name_entry.get_text().strip() or None
+        icon = self.selected_icon_path
+        self._unless_exists(
+            self.shortcuts.index.find_target(target),
+            lambda: self._create_shortcut(self.btn_create_file, create_file_shortcut,
+                                          target, icon, name),
+        )
+
+    def _create_file_shortcuts(self, paths):
+        # Targets that already have a shortcut are skipped in batch mode
+        index = self.shortcuts.index
+        todo = [p for p in paths if not index.find_target(p)]
+        skipped = len(paths) - len(todo)
+        if not todo:
+            self.show_toast(self.t("toast_created_skipped").format(0, skipped))
+            return
+        icon = self.selected_icon_path
+
+        def on_done(results, error):
+            self.btn_create_file.set_sensitive(True)
+            if error is not None:
+                self._show_error(error)
+                return
+            created = [path for _, path, _ in results if path]
+            for path in created:
+                index.update(path)
+            errors = [e for _, _, e in results if e is not None]
+            failed = [e for e in errors if not isinstance(e, InterruptedError)]
+            if failed:
+                self.show_toast(self.t("toast_failed_many").format(
+                    len(failed), len(results), failed[0]
+                ))
+            elif errors:
+                self.show_toast(self.t("toast_cancelled_many").format(
+                    len(created), len(results)
+                ))
+            elif skipped:
+                self.show_toast(self.t("toast_created_skipped").format(len(created), skipped))
+            else:
+                self.show_toast(self.t("toast_created_many").format(len(created)))
+
+        self.btn_create_file.set_sensitive(False)
+        self.jobs.submit(
+            lambda cancel, progress: create_file_shortcuts(
+                todo, icon, cancel=cancel, progress=progress
+            ),
+            on_done,
+        )
+
+    def on_create_app_shortcut(self, btn):
+        if not self.selected_app_info:
+            self.show_toast(self.t("toast_no_app"))
+            return
+        app = self.selected_app_info
+        name = self.app_name_entry.get_text().strip() or None
+        icon = self.selected_icon_path
+        self._unless_exists(
+            self.shortcuts.index.find_app(app.id),
+            lambda: self._create_shortcut(self.btn_create_app, create_app_shortcut,
+                                          app.path, icon, name),
+        )
+
+    def _create_shortcut(self, button, create, *args):
+        """Queue one shortcut; button stays insensitive until it is done."""
+        def on_done(path, error):
+            button.set_sensitive(True)
+            if error is not None:
+                self._show_error(error)
+                return
+            self.shortcuts.index.update(path)
+            self.show_toast(self.t("toast_created").format(os.path.basename(path)))
+
+        button.set_sensitive(False)
+        self.jobs.submit(lambda cancel, progress: create(*args), on_done)
+
+    def _show_error(self, error):
+        if isinstance(error, InterruptedError):
+            self.show_toast(self.t("toast_cancelled"))
+        else:
+            self.show_toast(self.t("toast_error").format(error))
+
+    # ────────────────────────────────────────────
+    #  Progress
+    # ────────────────────────────────────────────
+    PROGRESS_DELAY_MS = 200
+    PULSE_MS = 100
+
+    def _on_jobs_progress(self, active, done, total):
+        if not active:
+            if self._progress_source:
+                GLib.source_remove(self._progress_source)
+                self._progress_source = 0
+            self._stop_pulse()
+            self.progress_revealer.set_reveal_child(False)
+            return
+        if total:
+            self._stop_pulse()
+            self.progress_bar.set_fraction(done / total)
+            self.progress_bar.set_text(self.t("creating_progress").format(done, total))
+        else:
+            # Jobs without a count (single shortcuts) pulse until they end
+            self.progress_bar.pulse()
+            self.progress_bar.set_text(self.t("creating_shortcut"))
+            if not self._pulse_source:
+                self._pulse_source = GLib.timeout_add(self.PULSE_MS, self._on_pulse)
+        # Only jobs that take a noticeable time show the bar
+        if not self.progress_revealer.get_reveal_child() and not self._progress_source:
+            self._progress_source = GLib.timeout_add(
+                self.PROGRESS_DELAY_MS, self._reveal_progress
+            )
+
+    def _reveal_progress(self):
+        self._progress_source = 0
+        self.progress_revealer.set_reveal_child(True)
+        return GLib.SOURCE_REMOVE
+
+    def _on_pulse(self):
+        self.progress_bar.pulse()
+        return GLib.SOURCE_CONTINUE
+
+    def _stop_pulse(self):
+        if self._pulse_source:
+            GLib.source_remove(self._pulse_source)
+            self._pulse_source = 0
+
+    # ────────────────────────────────────────────
+    #  Existing shortcuts
+    # ────────────────────────────────────────────
+    def _unless_exists(self, existing, create):
+        """Run create(), after asking if a shortcut for the same target
+        is already on the desktop."""
+        if existing is None:
+            create()
+            return
+        name = os.path.basename(existing)
+        dialog = Adw.MessageDialog(
+            transient_for=self, heading=self.t("exists_heading"),
+            body=self.t("exists_body").format(name),
+        )
+        dialog.add_response("keep", self.t("btn_keep_existing"))
+        dialog.add_response("create", self.t("btn_create_another"))
+        dialog.set_default_response("keep")
+        dialog.set_close_response("keep")
+
+        def on_response(dialog, response):
+            if response == "create":
+                create()
+            else:
+                self.show_toast(self.t("toast_exists").format(name))
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def on_clean_stale(self, btn):
+        stale = self.shortcuts.index.stale()
+        if not stale:
+            self.show_toast(self.t("toast_stale_none"))
+            return
+        names = [os.path.basename(path) for path, _, _ in stale]
+        listing = "\n".join(names[:10]) + ("\n…" if len(names) > 10 else "")
+        dialog = Adw.MessageDialog(
+            transient_for=self, heading=self.t("stale_heading").format(len(stale)),
+            body=self.t("stale_body").format(listing),
+        )
+        dialog.add_response("cancel", self.t("btn_cancel"))
+        dialog.add_response("remove", self.t("btn_remove"))
+        dialog.set_response_appearance("remove", Adw.ResponseAppearance.DESTRUCTIVE)
+        dialog.set_default_response("cancel")
+        dialog.set_close_response("cancel")
+
+        def on_response(dialog, response):
+            if response == "remove":
+                self._remove_stale([path for path, _, _ in stale])
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def _remove_stale(self, paths):
+        results = self.shortcuts.index.remove(paths)
+        errors = [error for _, error in results if error is not None]
+        if errors:
+            self.show_toast(self.t("toast_error").format(errors[0]))
+        else:
+            self.show_toast(self.t("toast_stale_removed").format(len(results)))
+
+    def show_toast(self, message):
+        toast = Adw.Toast.new(message)
+        toast.set_timeout(3)
+        self.toast_overlay.add_toast(toast)
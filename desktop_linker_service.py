@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+Desktop Linker - live app catalog, shortcut index and session D-Bus service
+Needs GLib/Gio only, so "desktop-linker serve" also runs without a display.
+"""
+
+import gi
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio, GLib
+
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from desktop_linker import (
+    profiler, AppCatalogCache, get_app_search_dirs, iter_installed_apps,
+    desktop_file_id, resolve_app, get_desktop_dir, AppSearchIndex, ShortcutIndex,
+    NameAllocator, create_file_shortcut, create_file_shortcuts, create_app_shortcut,
+)
+
+APP_ID = "io.github.desktoplinker"
+OBJECT_PATH = "/io/github/desktoplinker"
+INTERFACE = "io.github.desktoplinker.Shortcuts"
+
+# Empty strings stand for "not given" (default icon, default name).
+# Batch results are (target, shortcut path, error message), one of the
+# last two empty.
+INTERFACE_XML = f"""
+<node>
+  <interface name="{INTERFACE}">
+    <method name="CreateFileShortcut">
+      <arg direction="in" name="path" type="s"/>
+      <arg direction="in" name="icon" type="s"/>
+      <arg direction="in" name="name" type="s"/>
+      <arg direction="out" name="shortcut" type="s"/>
+    </method>
+    <method name="CreateFileShortcuts">
+      <arg direction="in" name="paths" type="as"/>
+      <arg direction="in" name="icon" type="s"/>
+      <arg direction="out" name="results" type="a(sss)"/>
+    </method>
+    <method name="CreateAppShortcut">
+      <arg direction="in" name="desktop_id" type="s"/>
+      <arg direction="in" name="icon" type="s"/>
+      <arg direction="in" name="name" type="s"/>
+      <arg direction="out" name="shortcut" type="s"/>
+    </method>
+    <method name="CreateAppShortcuts">
+      <arg direction="in" name="desktop_ids" type="as"/>
+      <arg direction="in" name="icon" type="s"/>
+      <arg direction="out" name="results" type="a(sss)"/>
+    </method>
+    <method name="ListApps">
+      <arg direction="out" name="apps" type="a(ssss)"/>
+    </method>
+    <method name="SearchApps">
+      <arg direction="in" name="query" type="s"/>
+      <arg direction="in" name="limit" type="u"/>
+      <arg direction="out" name="apps" type="a(ssss)"/>
+    </method>
+  </interface>
+</node>
+"""
+
+ERROR_NOT_FOUND = "io.github.desktoplinker.Error.NotFound"
+ERROR_FAILED = "io.github.desktoplinker.Error.Failed"
+
+
+# ─────────────────────────────────────────────
+#  Live catalog
+# ─────────────────────────────────────────────
+
+def changed_paths(file, other_file, event):
+    """Paths a directory monitor event created, changed or removed; empty
+    for events that leave the directory's files as they were."""
+    E = Gio.FileMonitorEvent
+    if event in (E.CHANGES_DONE_HINT, E.CREATED, E.DELETED, E.MOVED_IN, E.MOVED_OUT):
+        files = [file]
+    elif event == E.RENAMED:
+        files = [file, other_file]
+    else:
+        return []
+    return [f.get_path() for f in files if f is not None and f.get_path()]
+
+
+class LiveCatalog:
+    """The installed apps, kept current on the GLib main loop.
+
+    Discovery runs in a worker thread and arrives in batches; directory
+    monitors feed later changes in, coalesced. Callbacks registered with
+    connect_changed(added, removed) and connect_loaded() run on the main
+    loop.
+    """
+    BATCH_SIZE = 200
+    CHANGES_DELAY_MS = 500
+
+    def __init__(self):
+        self.apps_by_id = {}
+        self.index = AppSearchIndex()
+        self.loaded = False
+        self.search_dirs = get_app_search_dirs()
+        self._monitors = {}
+        self._pending_changes = set()
+        self._changes_source = 0
+        self._cancelled = threading.Event()
+        self._changed_callbacks = []
+        self._loaded_callbacks = []
+
+    def connect_changed(self, callback):
+        self._changed_callbacks.append(callback)
+
+    def connect_loaded(self, callback):
+        """callback() once discovery has finished (now, if it already has)."""
+        if self.loaded:
+            callback()
+        else:
+            self._loaded_callbacks.append(callback)
+
+    def start(self):
+        for d in self.search_dirs:
+            self._monitor_dir(d)
+        thread = threading.Thread(target=self._discover, daemon=True)
+        thread.start()
+
+    def stop(self):
+        self._cancelled.set()
+        for monitor in self._monitors.values():
+            monitor.cancel()
+        self._monitors = {}
+        if self._changes_source:
+            GLib.source_remove(self._changes_source)
+            self._changes_source = 0
+
+    def get(self, desktop_id):
+        return self.apps_by_id.get(desktop_id)
+
+    def search(self, query):
+        return self.index.search(query)
+
+    def _update(self, added, removed):
+        for app in removed:
+            del self.apps_by_id[app.id]
+        for app in added:
+            self.apps_by_id[app.id] = app
+        self.index.remove(removed)
+        self.index.add(added)
+        for callback in self._changed_callbacks:
+            callback(added, removed)
+
+    # ── Discovery (worker thread) ──
+    def _discover(self):
+        """Runs in a worker thread; hands results to the main loop in batches."""
+        cache = AppCatalogCache()
+        try:
+            for found in iter_installed_apps(cache=cache):
+                for i in range(0, len(found), self.BATCH_SIZE):
+                    if self._cancelled.is_set():
+                        return
+                    GLib.idle_add(self._on_batch, found[i:i + self.BATCH_SIZE])
+        finally:
+            GLib.idle_add(self._on_loaded, list(cache.dirs))
+
+    def _on_batch(self, batch):
+        if not self._cancelled.is_set():
+            self._update(batch, [])
+        return GLib.SOURCE_REMOVE
+
+    def _on_loaded(self, scanned_dirs):
+        if self._cancelled.is_set():
+            return GLib.SOURCE_REMOVE
+        self.loaded = True
+        profiler.mark("apps_loaded")
+        # Subdirectories are only known after the recursive scan
+        for d in scanned_dirs:
+            self._monitor_dir(d)
+        callbacks, self._loaded_callbacks = self._loaded_callbacks, []
+        for callback in callbacks:
+            callback()
+        if self._pending_changes:
+            self._schedule_changes()
+        return GLib.SOURCE_REMOVE
+
+    # ── Live updates ──
+    def _monitor_dir(self, directory):
+        if directory in self._monitors:
+            return
+        try:
+            monitor = Gio.File.new_for_path(directory).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None
+            )
+        except GLib.Error:
+            return
+        monitor.connect("changed", self._on_dir_changed)
+        self._monitors[directory] = monitor
+
+    def _on_dir_changed(self, monitor, file, other_file, event):
+        for path in changed_paths(file, other_file, event):
+            name = os.path.basename(path)
+            if name.startswith("."):
+                continue
+            if name.endswith(".desktop"):
+                self._pending_changes.add(path)
+            elif event == Gio.FileMonitorEvent.CREATED and os.path.isdir(path):
+                self._monitor_dir(path)
+        if self._pending_changes:
+            self._schedule_changes()
+
+    def _schedule_changes(self):
+        # Bursts (e.g. package upgrades) are coalesced into one update
+        if self._changes_source == 0 and self.loaded:
+            self._changes_source = GLib.timeout_add(
+                self.CHANGES_DELAY_MS, self._apply_changes
+            )
+
+    def _apply_changes(self):
+        self._changes_source = 0
+        paths, self._pending_changes = self._pending_changes, set()
+
+        # Re-resolve each affected desktop-file ID across all search dirs,
+        # so a user entry added or removed correctly shadows a system one
+        removed, added = [], []
+        rel_paths = {desktop_file_id(p, self.search_dirs)[1] for p in paths}
+        for rel in sorted(rel_paths):
+            old = self.apps_by_id.get(rel.replace(os.sep, "-"))
+            if old is not None:
+                removed.append(old)
+            new = resolve_app(rel, self.search_dirs)
+            if new is not None:
+                added.append(new)
+        if removed or added:
+            self._update(added, removed)
+        return GLib.SOURCE_REMOVE
+
+
+class LiveShortcuts:
+    """The ShortcutIndex of the desktop directory, kept current by a
+    directory monitor on the GLib main loop."""
+
+    def __init__(self):
+        self.index = None
+        self._monitor = None
+
+    def start(self):
+        self.index = ShortcutIndex().scan()
+        try:
+            self._monitor = Gio.File.new_for_path(self.index.directory).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None
+            )
+        except GLib.Error:
+            return
+        self._monitor.connect("changed", self._on_dir_changed)
+
+    def stop(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        if self.index is not None:
+            self.index.save()
+
+    def _on_dir_changed(self, monitor, file, other_file, event):
+        for path in changed_paths(file, other_file, event):
+            self.index.update(path)
+
+
+# ─────────────────────────────────────────────
+#  Shortcut jobs
+# ─────────────────────────────────────────────
+
+class ShortcutJobs:
+    """Creates shortcuts in a worker thread, one job after another.
+
+    submit() returns at once, so requests queue up without blocking the
+    window on slow (network, encrypted) home directories. Progress and
+    results are delivered on the GLib main loop; cancel() skips the queued
+    jobs and stops a running batch between shortcuts.
+    """
+    def __init__(self, on_progress=None):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._cancel = threading.Event()
+        self._on_progress = on_progress     # (jobs in flight, done, total)
+        self.active = 0
+
+    def submit(self, work, on_done):
+        """Run work(cancel, progress) in the worker, then call
+        on_done(result, error) on the main loop."""
+        self.active += 1
+        self._notify(0, 0)
+        self._executor.submit(self._run, work, on_done, self._cancel)
+
+    def cancel(self):
+        self._cancel.set()
+        self._cancel = threading.Event()
+
+    def shutdown(self):
+        # A batch already being written is finished, the queue is dropped
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _run(self, work, on_done, cancel):
+        """Runs in the worker thread."""
+        result = error = None
+        if cancel.is_set():
+            error = InterruptedError("cancelled")
+        else:
+            try:
+                result = work(cancel, self._report)
+            except Exception as e:
+                error = e
+        GLib.idle_add(self._finish, on_done, result, error)
+
+    def _report(self, done, total):
+        GLib.idle_add(self._progress, done, total)
+
+    def _progress(self, done, total):
+        if self.active:
+            self._notify(done, total)
+        return GLib.SOURCE_REMOVE
+
+    def _finish(self, on_done, result, error):
+        self.active -= 1
+        on_done(result, error)
+        self._notify(0, 0)
+        return GLib.SOURCE_REMOVE
+
+    def _notify(self, done, total):
+        if self._on_progress is not None:
+            self._on_progress(self.active, done, total)
+
+
+
+# ─────────────────────────────────────────────
+#  D-Bus interface
+# ─────────────────────────────────────────────
+
+# Methods that write shortcuts: their handlers return the work, which runs
+# on the jobs worker so the main loop (and a window in the same process)
+# never waits for icon decoding or fsync.
+WRITE_METHODS = frozenset((
+    "CreateFileShortcut", "CreateFileShortcuts", "CreateAppShortcut", "CreateAppShortcuts",
+))
+
+class ShortcutService:
+    """Serves the io.github.desktoplinker.Shortcuts interface from a
+    LiveCatalog. Calls that need the catalog wait for discovery, and
+    shortcuts are written one call after another in a worker thread. With
+    an application, every call holds it until it is answered, which also
+    resets its inactivity timeout.
+    """
+
+    def __init__(self, catalog, application=None):
+        self.catalog = catalog
+        self.application = application
+        self.jobs = ShortcutJobs()
+        self._registrations = []
+        self._node = Gio.DBusNodeInfo.new_for_xml(INTERFACE_XML)
+
+    def export(self, connection, object_path=OBJECT_PATH):
+        reg_id = connection.register_object(
+            object_path, self._node.interfaces[0], self._on_method_call, None, None
+        )
+        self._registrations.append((connection, reg_id))
+
+    def unexport(self):
+        for connection, reg_id in self._registrations:
+            connection.unregister_object(reg_id)
+        self._registrations = []
+        self.jobs.shutdown()
+
+    def _on_method_call(self, connection, sender, object_path, interface_name,
+                        method_name, parameters, invocation):
+        handler = getattr(self, "_call_" + method_name, None)
+        if handler is None:
+            invocation.return_dbus_error(
+                "org.freedesktop.DBus.Error.UnknownMethod", method_name
+            )
+            return
+        args = parameters.unpack()
+        if self.application is not None:
+            self.application.hold()
+        if method_name in ("CreateFileShortcut", "CreateFileShortcuts"):
+            self._dispatch(method_name, handler, args, invocation)
+        else:
+            self.catalog.connect_loaded(
+                lambda: self._dispatch(method_name, handler, args, invocation)
+            )
+
+    def _dispatch(self, method_name, handler, args, invocation):
+        span = "dbus:" + method_name
+        try:
+            with profiler.span(span):
+                signature, value = handler(*args)
+        except Exception as e:
+            self._reply(invocation, None, None, e)
+            return
+        if method_name not in WRITE_METHODS:
+            self._reply(invocation, signature, value, None)
+            return
+
+        def work(cancel, progress):
+            with profiler.span(span + ":work"):
+                return value()
+        self.jobs.submit(work, lambda result, error:
+                         self._reply(invocation, signature, result, error))
+
+    def _reply(self, invocation, signature, value, error):
+        try:
+            if error is None:
+                invocation.return_value(GLib.Variant(signature, (value,)))
+            elif isinstance(error, LookupError):
+                invocation.return_dbus_error(ERROR_NOT_FOUND, str(error))
+            else:
+                invocation.return_dbus_error(ERROR_FAILED, str(error))
+        finally:
+            if self.application is not None:
+                self.application.release()
+
+    @staticmethod
+    def _app_tuples(apps):
+        return [(a.id, a.name, a.icon, a.path) for a in apps]
+
+    def _lookup(self, desktop_id):
+        app = self.catalog.get(desktop_id)
+        if app is None and not desktop_id.endswith(".desktop"):
+            app = self.catalog.get(desktop_id + ".desktop")
+        if app is None:
+            raise LookupError(f"no such app: {desktop_id}")
+        return app
+
+    # The Create handlers only resolve their arguments on the main loop and
+    # return the writing as a function for the worker (see WRITE_METHODS)
+
+    def _call_CreateFileShortcut(self, path, icon, name):
+        path = os.path.abspath(path)
+        return "(s)", lambda: create_file_shortcut(path, icon or None, name or None)
+
+    def _call_CreateFileShortcuts(self, paths, icon):
+        paths = [os.path.abspath(p) for p in paths]
+
+        def work():
+            results = create_file_shortcuts(paths, icon or None)
+            return [(t, p or "", str(e) if e else "") for t, p, e in results]
+        return "(a(sss))", work
+
+    def _call_CreateAppShortcut(self, desktop_id, icon, name):
+        app = self._lookup(desktop_id)
+        return "(s)", lambda: create_app_shortcut(app.path, icon or None, name or None)
+
+    def _call_CreateAppShortcuts(self, desktop_ids, icon):
+        sources = []
+        for desktop_id in desktop_ids:
+            try:
+                sources.append((desktop_id, self._lookup(desktop_id).path, None))
+            except LookupError as e:
+                sources.append((desktop_id, None, e))
+
+        def work():
+            allocator = NameAllocator(get_desktop_dir())
+            results = []
+            for desktop_id, source, error in sources:
+                try:
+                    if error is not None:
+                        raise error
+                    path = create_app_shortcut(source, icon or None, allocator=allocator)
+                    results.append((desktop_id, path, ""))
+                except Exception as e:
+                    results.append((desktop_id, "", str(e)))
+            allocator.sync()
+            return results
+        return "(a(sss))", work
+
+    def _call_ListApps(self):
+        return "(a(ssss))", self._app_tuples(self.catalog.search(""))
+
+    def _call_SearchApps(self, query, limit):
+        apps = self.catalog.search(query)
+        return "(a(ssss))", self._app_tuples(apps[:limit] if limit else apps)
+
+
+# ─────────────────────────────────────────────
+#  Headless service
+# ─────────────────────────────────────────────
+
+# Exported (as app.handover) only by the headless service: a window
+# launch asks it to exit so that the window can own the application ID
+HANDOVER_ACTION = "handover"
+
+
+class ServiceApplication(Gio.Application):
+    """Runs the D-Bus interface without GTK; exits after IDLE_TIMEOUT_MS
+    without calls (it is restarted by D-Bus activation on demand).
+
+    It holds the same application ID as the window but cannot show one,
+    so it steps aside for it: see take_over_service().
+    """
+    IDLE_TIMEOUT_MS = 5 * 60 * 1000
+
+    def __init__(self):
+        super().__init__(application_id=APP_ID,
+                         flags=Gio.ApplicationFlags.IS_SERVICE)
+        self.set_inactivity_timeout(self.IDLE_TIMEOUT_MS)
+        self.catalog = LiveCatalog()
+        self.service = ShortcutService(self.catalog, self)
+        self.connect("startup", self.on_startup)
+        self.connect("shutdown", self.on_shutdown)
+        self.connect("activate", self.on_activate)
+
+    def on_startup(self, app):
+        self.catalog.start()
+        self.service.export(self.get_dbus_connection())
+        handover = Gio.SimpleAction.new(HANDOVER_ACTION, None)
+        handover.connect("activate", lambda action, param: self.quit())
+        self.add_action(handover)
+
+    def on_activate(self, app):
+        # A window was asked for (by a launch that did not take over first).
+        # Exit rather than keep the ID, so the next launch gets its window.
+        print("desktop-linker: no display in the service, exiting for the window",
+              file=sys.stderr)
+        self.quit()
+
+    def on_shutdown(self, app):
+        self.service.unexport()
+        self.catalog.stop()
+
+
+def has_display():
+    return bool(os.environ.get("WAYLAND_DISPLAY") or os.environ.get("DISPLAY"))
+
+
+def take_over_service(timeout_s=2.0):
+    """Make a running headless service give up the application ID.
+
+    Called before the window registers: otherwise it would become a remote
+    instance of a process that has no display, and no window would open
+    until the service timed out. A window instance does not export the
+    handover action and is left alone. Returns True if a service exited.
+    """
+    try:
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        # NO_AUTO_START: never D-Bus-activate a service just to stop it
+        actions = bus.call_sync(
+            APP_ID, OBJECT_PATH, "org.gtk.Actions", "List", None,
+            GLib.VariantType("(as)"), Gio.DBusCallFlags.NO_AUTO_START, 1000, None,
+        ).unpack()[0]
+        if HANDOVER_ACTION not in actions:
+            return False
+        bus.call_sync(
+            APP_ID, OBJECT_PATH, "org.gtk.Actions", "Activate",
+            GLib.Variant("(sava{sv})", (HANDOVER_ACTION, [], {})),
+            None, Gio.DBusCallFlags.NO_AUTO_START, 1000, None,
+        )
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            owned = bus.call_sync(
+                "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus",
+                "NameHasOwner", GLib.Variant("(s)", (APP_ID,)),
+                GLib.VariantType("(b)"), Gio.DBusCallFlags.NONE, 1000, None,
+            ).unpack()[0]
+            if not owned:
+                break
+            time.sleep(0.05)
+    except GLib.Error:
+        return False    # no session bus, or nothing owns the ID
+    return True
+
+
+def run_service(argv=()):
+    """Entry point of "desktop-linker serve".
+
+    With a display, the regular application runs in background mode, so
+    that launching Desktop Linker later opens its window in this process.
+    Without one, a GTK-free service runs instead.
+    """
+    if has_display():
+        from desktop_linker_gui import DesktopLinkerApp
+        return DesktopLinkerApp().run([sys.argv[0], "--background", *argv])
+    return ServiceApplication().run([sys.argv[0], *argv])
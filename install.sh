@@ -6,6 +6,7 @@ set -e
 
 INSTALL_DIR="/opt/desktop-linker"
 DESKTOP_FILE="$HOME/.local/share/applications/desktop_linker.desktop"
+DBUS_SERVICE_FILE="$HOME/.local/share/dbus-1/services/io.github.desktoplinker.service"
 
 # Colors
 RED='\033[0;31m'
@@ -144,8 +145,8 @@ fi
 echo ""
 
 # Check if script is run from the correct directory
-if [ ! -f "desktop_linker.py" ]; then
-    err "desktop_linker.py not found!"
+if [ ! -f "desktop-linker" ] || [ ! -f "desktop_linker.py" ] || [ ! -f "desktop_linker_gui.py" ] || [ ! -f "desktop_linker_service.py" ]; then
+    err "desktop_linker.py / desktop_linker_gui.py / desktop_linker_service.py not found!"
     err "Please run this script from the folder where desktop_linker.py is located."
     exit 1
 fi
@@ -153,10 +154,19 @@ fi
 # Install app files
 echo "Installing to $INSTALL_DIR ..."
 sudo mkdir -p "$INSTALL_DIR"
-sudo cp desktop_linker.py "$INSTALL_DIR/desktop_linker.py"
+sudo cp desktop-linker desktop_linker.py desktop_linker_gui.py desktop_linker_service.py "$INSTALL_DIR/"
 sudo chmod 755 "$INSTALL_DIR"
-sudo chmod 644 "$INSTALL_DIR/desktop_linker.py"
-ok "Files copied"
+sudo chmod 755 "$INSTALL_DIR/desktop-linker"
+sudo chmod 644 "$INSTALL_DIR/desktop_linker.py" "$INSTALL_DIR/desktop_linker_gui.py" "$INSTALL_DIR/desktop_linker_service.py"
+# Users cannot write $INSTALL_DIR, so the bytecode is compiled once here
+sudo rm -rf "$INSTALL_DIR/__pycache__"
+sudo python3 -m compileall -q "$INSTALL_DIR"
+sudo rm -rf "$INSTALL_DIR/locales"
+sudo cp -r locales "$INSTALL_DIR/locales"
+sudo chmod 755 "$INSTALL_DIR/locales"
+sudo chmod 644 "$INSTALL_DIR/locales/"*.json
+sudo ln -sf "$INSTALL_DIR/desktop-linker" /usr/local/bin/desktop-linker
+ok "Files copied (command line: desktop-linker)"
 
 # Create .desktop entry
 echo "Registering app in menu..."
@@ -168,7 +178,7 @@ Version=1.0
 Type=Application
 Name=Desktop Linker
 Comment=Create desktop shortcuts for files, folders and applications
-Exec=python3 $INSTALL_DIR/desktop_linker.py
+Exec=$INSTALL_DIR/desktop-linker
 Icon=insert-link
 Terminal=false
 Categories=Utility;
@@ -178,6 +188,15 @@ DESKTOP
 chmod +x "$DESKTOP_FILE"
 update-desktop-database "$HOME/.local/share/applications" 2>/dev/null && ok "App menu updated" || true
 
+# D-Bus activation: "gdbus call --dest io.github.desktoplinker ..." starts the service on demand
+mkdir -p "$(dirname "$DBUS_SERVICE_FILE")"
+cat > "$DBUS_SERVICE_FILE" << DBUS
+[D-BUS Service]
+Name=io.github.desktoplinker
+Exec=$INSTALL_DIR/desktop-linker serve
+DBUS
+ok "D-Bus service registered"
+
 echo ""
 echo "╔═══════════════════════════════════════╗"
 echo "║      ✓ Installation complete!         ║"
@@ -15,8 +15,10 @@ rm -rf "/tmp/desktop-linker-build"
 
 # Create structure
 mkdir -p "$BUILD_DIR/DEBIAN"
+mkdir -p "$BUILD_DIR/usr/bin"
 mkdir -p "$BUILD_DIR/usr/share/desktop-linker"
 mkdir -p "$BUILD_DIR/usr/share/applications"
+mkdir -p "$BUILD_DIR/usr/share/dbus-1/services"
 mkdir -p "$BUILD_DIR/usr/share/doc/desktop-linker"
 
 # Control file
@@ -36,13 +38,16 @@ Homepage: https://github.com/MaKom70/desktop-linker
 EOF
 
 # Post-install / post-remove scripts
+# Bytecode is compiled here since users cannot write /usr/share
 cat > "$BUILD_DIR/DEBIAN/postinst" << 'EOF'
 #!/bin/bash
+python3 -m compileall -q /usr/share/desktop-linker 2>/dev/null || true
 update-desktop-database /usr/share/applications 2>/dev/null || true
 EOF
 
 cat > "$BUILD_DIR/DEBIAN/postrm" << 'EOF'
 #!/bin/bash
+rm -rf /usr/share/desktop-linker/__pycache__
 update-desktop-database /usr/share/applications 2>/dev/null || true
 EOF
 
@@ -50,8 +55,18 @@ chmod 755 "$BUILD_DIR/DEBIAN/postinst"
 chmod 755 "$BUILD_DIR/DEBIAN/postrm"
 
 # App files
-cp desktop_linker.py "$BUILD_DIR/usr/share/desktop-linker/"
-chmod 644 "$BUILD_DIR/usr/share/desktop-linker/desktop_linker.py"
+cp desktop-linker desktop_linker.py desktop_linker_gui.py desktop_linker_service.py "$BUILD_DIR/usr/share/desktop-linker/"
+chmod 644 "$BUILD_DIR/usr/share/desktop-linker/"*.py
+chmod 755 "$BUILD_DIR/usr/share/desktop-linker/desktop-linker"
+cp -r locales "$BUILD_DIR/usr/share/desktop-linker/"
+chmod 644 "$BUILD_DIR/usr/share/desktop-linker/locales/"*.json
+
+# Command-line launcher
+cat > "$BUILD_DIR/usr/bin/desktop-linker" << 'EOF'
+#!/bin/sh
+exec python3 /usr/share/desktop-linker/desktop-linker "$@"
+EOF
+chmod 755 "$BUILD_DIR/usr/bin/desktop-linker"
 
 # Desktop entry
 cat > "$BUILD_DIR/usr/share/applications/desktop-linker.desktop" << EOF
@@ -60,7 +75,7 @@ Version=1.0
 Type=Application
 Name=Desktop Linker
 Comment=Create desktop shortcuts for files, folders and applications
-Exec=python3 /usr/share/desktop-linker/desktop_linker.py
+Exec=/usr/bin/desktop-linker
 Icon=insert-link
 Terminal=false
 Categories=Utility;
@@ -69,6 +84,14 @@ Keywords=shortcut;desktop;link;folder;
 EOF
 chmod 644 "$BUILD_DIR/usr/share/applications/desktop-linker.desktop"
 
+# D-Bus activation file
+cat > "$BUILD_DIR/usr/share/dbus-1/services/io.github.desktoplinker.service" << EOF
+[D-BUS Service]
+Name=io.github.desktoplinker
+Exec=/usr/bin/desktop-linker serve
+EOF
+chmod 644 "$BUILD_DIR/usr/share/dbus-1/services/io.github.desktoplinker.service"
+
 # Copyright
 cp packaging/copyright "$BUILD_DIR/usr/share/doc/desktop-linker/copyright"
 